@@ -55,11 +55,13 @@ Genesis = pxsol.bincode.Struct([
 
 
 with open('res/genesis.bin', 'rb') as f:
-    conf = Genesis.decode(f)
+    data = memoryview(f.read())
+_, offset = Genesis.kype[0].decode_buffer(data, 0)
+# Stream the accounts one at a time, only their lamports are kept.
+accs = [(e[0], e[1][0]) for e, _ in Genesis.kype[1].iter_decode_buffer(data, offset)]
 
-accs = list(conf[1].items())
-accs.sort(key=lambda x: -x[1][0])
+accs.sort(key=lambda x: -x[1])
 for elem in accs:
     col0 = f'{elem[0].base58():<44}'
-    col1 = f'{elem[1][0] / pxsol.denomination.sol:>12.2f}'
+    col1 = f'{elem[1] / pxsol.denomination.sol:>12.2f}'
     print(col0, col1)
@@ -0,0 +1,20 @@
+import argparse
+import pxsol
+
+# Search a vanity address, an address that starts with the prefix and ends with the suffix. Each extra character makes
+# the search about 58 times longer. All cores are used.
+#
+# The search runs in a process pool, so the script body is guarded by __main__: the workers import this module under
+# the forkserver and spawn start methods.
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefix', type=str, default='', help='address prefix')
+    parser.add_argument('--suffix', type=str, default='', help='address suffix')
+    parser.add_argument('--icase', action='store_true', help='ignore case')
+    args = parser.parse_args()
+
+    pxsol.config.current.log = 1
+    prikey = pxsol.vanity.search(args.prefix, args.suffix, args.icase)
+    print('prikey', prikey.base58())
+    print('pubkey', prikey.pubkey().base58())
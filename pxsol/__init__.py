@@ -13,4 +13,5 @@ from . import objectdict
 from . import program
 from . import rate
 from . import rpc
+from . import vanity
 from . import wallet
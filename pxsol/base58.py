@@ -12,49 +12,85 @@
 
 # Base58 encoding and decoding
 
+import typing
+
 B58_DIGITS = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+# All two-digit strings, indexed by their value in [0, 58 * 58). Encoding emits two digits per division.
+B58_PAIRS = [a + b for a in B58_DIGITS for b in B58_DIGITS]
+# Reverse lookup table for bytes.translate. Characters outside the alphabet are mapped to 0xff.
+B58_TABLE = bytes([B58_DIGITS.index(chr(i)) if chr(i) in B58_DIGITS else 0xff for i in range(256)])
 
 
 def encode(b: bytearray) -> str:
     # Encode bytes to a base58-encoded string
-    assert isinstance(b, bytearray)
-    # Convert big-endian bytes to integer
+    assert isinstance(b, (bytes, bytearray))
+    # Convert big-endian bytes to integer, then divide that integer into base58 digit pairs. The leading zero digit that
+    # an odd digit count leaves behind is stripped.
     n = int.from_bytes(b)
-    # Divide that integer into bas58
     res = []
     while n > 0:
-        n, r = divmod(n, 58)
-        res.append(B58_DIGITS[r])
-    res = ''.join(res[::-1])
+        n, r = divmod(n, 3364)
+        res.append(B58_PAIRS[r])
+    res = ''.join(res[::-1]).lstrip(B58_DIGITS[0])
     # Encode leading zeros as base58 zeros
-    czero = 0
-    pad = 0
-    for c in b:
-        if c == czero:
-            pad += 1
-        else:
-            break
+    pad = len(b) - len(b.lstrip(bytes(1)))
     return B58_DIGITS[0] * pad + res
 
 
+def encode_many(b: typing.List[bytearray]) -> typing.List[str]:
+    # Encode a batch of byte strings, such as the keys or signatures of an rpc response.
+    return [encode(e) for e in b]
+
+
+def decode_int(s: str) -> int:
+    # Decode a base58-encoding string to an integer. Digits are looked up through a translate table and folded ten at a
+    # time into a limb of base 58^10, so the big integer is only touched once per limb.
+    d = s.encode().translate(B58_TABLE)
+    assert 0xff not in d
+    n = 0
+    k = len(d) % 10
+    for x in d[:k]:
+        n = n * 58 + x
+    for i in range(k, len(d), 10):
+        a, b, c, e, f, g, h, j, l, m = d[i:i + 10]
+        n = n * 430804206899405824 + (((((((((a * 58 + b) * 58 + c) * 58 + e) * 58 + f) * 58 + g) * 58 + h) * 58 + j)
+                                      * 58 + l) * 58 + m)
+    return n
+
+
 def decode(s: str) -> bytearray:
     # Decode a base58-encoding string, returning bytes.
     if not s:
         return bytearray()
     # Convert the string to an integer
-    n = 0
-    for c in s:
-        n *= 58
-        assert c in B58_DIGITS
-        digit = B58_DIGITS.index(c)
-        n += digit
+    n = decode_int(s)
     # Convert the integer to bytes
     res = bytearray(n.to_bytes(max((n.bit_length() + 7) // 8, 1)))
     # Add padding back.
-    pad = 0
-    for c in s[:-1]:
-        if c == B58_DIGITS[0]:
-            pad += 1
-        else:
-            break
+    pad = len(s) - len(s[:-1].lstrip(B58_DIGITS[0])) - 1
     return bytearray(pad) + res
+
+
+def decode_size(s: str, size: int) -> bytearray:
+    # Decode a base58-encoding string of a value with known width. The string must be the canonical encoding, that is,
+    # it has exactly one leading base58 zero for every leading zero byte.
+    n = decode_int(s)
+    assert n >> (size * 8) == 0
+    res = bytearray(n.to_bytes(size))
+    assert len(s) - len(s.lstrip(B58_DIGITS[0])) == size - len(res.lstrip(bytes(1)))
+    return res
+
+
+def decode_many(s: typing.List[str], size: int) -> typing.List[bytearray]:
+    # Decode a batch of base58-encoding strings of a value with known width.
+    return [decode_size(e, size) for e in s]
+
+
+def decode32(s: str) -> bytearray:
+    # Decode a 32-byte public key or hash.
+    return decode_size(s, 32)
+
+
+def decode64(s: str) -> bytearray:
+    # Decode a 64-byte signature.
+    return decode_size(s, 64)
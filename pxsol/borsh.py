@@ -1,4 +1,3 @@
-import itertools
 import pxsol.io
 import struct
 import typing
@@ -8,185 +7,423 @@ import typing
 
 
 class U8:
+    format = 'B'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 1), 'little')
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return pxsol.io.unpack_buffer('<B', data, offset)[0], offset + 1
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= 0x00
         assert number <= 0xff
         return bytearray(number.to_bytes(1, 'little'))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<B', buf, offset, number)
+        return offset + 1
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 1
+
 
 class U16:
+    format = 'H'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 2), 'little')
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return pxsol.io.unpack_buffer('<H', data, offset)[0], offset + 2
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= 0x00
         assert number <= 0xffff
         return bytearray(number.to_bytes(2, 'little'))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<H', buf, offset, number)
+        return offset + 2
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 2
+
 
 class U32:
+    format = 'I'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 4), 'little')
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return pxsol.io.unpack_buffer('<I', data, offset)[0], offset + 4
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= 0x00
         assert number <= 0xffffffff
         return bytearray(number.to_bytes(4, 'little'))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<I', buf, offset, number)
+        return offset + 4
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 4
+
 
 class U64:
+    format = 'Q'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 8), 'little')
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return pxsol.io.unpack_buffer('<Q', data, offset)[0], offset + 8
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= 0x00
         assert number <= 0xffffffffffffffff
         return bytearray(number.to_bytes(8, 'little'))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<Q', buf, offset, number)
+        return offset + 8
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 8
+
 
 class U128:
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 16), 'little')
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return int.from_bytes(pxsol.io.read_buffer(data, offset, 16), 'little'), offset + 16
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= 0x00
         assert number <= 0xffffffffffffffffffffffffffffffff
         return bytearray(number.to_bytes(16, 'little'))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        buf[offset:offset + 16] = cls.encode(number)
+        return offset + 16
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 16
+
 
 class I8:
+    format = 'b'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 1), 'little', signed=True)
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return pxsol.io.unpack_buffer('<b', data, offset)[0], offset + 1
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= -0x80
         assert number <= +0x7f
         return bytearray(number.to_bytes(1, 'little', signed=True))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<b', buf, offset, number)
+        return offset + 1
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 1
+
 
 class I16:
+    format = 'h'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 2), 'little', signed=True)
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return pxsol.io.unpack_buffer('<h', data, offset)[0], offset + 2
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= -0x8000
         assert number <= +0x7fff
         return bytearray(number.to_bytes(2, 'little', signed=True))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<h', buf, offset, number)
+        return offset + 2
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 2
+
 
 class I32:
+    format = 'i'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 4), 'little', signed=True)
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return pxsol.io.unpack_buffer('<i', data, offset)[0], offset + 4
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= -0x80000000
         assert number <= +0x7fffffff
         return bytearray(number.to_bytes(4, 'little', signed=True))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<i', buf, offset, number)
+        return offset + 4
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 4
+
 
 class I64:
+    format = 'q'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 8), 'little', signed=True)
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return pxsol.io.unpack_buffer('<q', data, offset)[0], offset + 8
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= -0x8000000000000000
         assert number <= +0x7fffffffffffffff
         return bytearray(number.to_bytes(8, 'little', signed=True))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<q', buf, offset, number)
+        return offset + 8
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 8
+
 
 class I128:
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return int.from_bytes(pxsol.io.read_full(reader, 16), 'little', signed=True)
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return int.from_bytes(pxsol.io.read_buffer(data, offset, 16), 'little', signed=True), offset + 16
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         assert number >= -0x80000000000000000000000000000000
         assert number <= +0x7fffffffffffffffffffffffffffffff
         return bytearray(number.to_bytes(16, 'little', signed=True))
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        buf[offset:offset + 16] = cls.encode(number)
+        return offset + 16
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return 16
+
 
 class F32:
+    format = 'f'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> float:
         return struct.unpack('<f', pxsol.io.read_full(reader, 4))[0]
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[float, int]:
+        return pxsol.io.unpack_buffer('<f', data, offset)[0], offset + 4
+
     @classmethod
     def encode(cls, number: float) -> bytearray:
         return bytearray(struct.pack('<f', number))
 
+    @classmethod
+    def encode_into(cls, number: float, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<f', buf, offset, number)
+        return offset + 4
+
+    @classmethod
+    def size_of(cls, number: float) -> int:
+        return 4
+
 
 class F64:
+    format = 'd'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> float:
         return struct.unpack('<d', pxsol.io.read_full(reader, 8))[0]
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[float, int]:
+        return pxsol.io.unpack_buffer('<d', data, offset)[0], offset + 8
+
     @classmethod
     def encode(cls, number: float) -> bytearray:
         return bytearray(struct.pack('<d', number))
 
+    @classmethod
+    def encode_into(cls, number: float, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<d', buf, offset, number)
+        return offset + 8
+
+    @classmethod
+    def size_of(cls, number: float) -> int:
+        return 8
+
 
 class Bool:
+    format = '?'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> bool:
         return pxsol.io.read_full(reader, 1)[0] != 0
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[bool, int]:
+        return pxsol.io.read_buffer(data, offset, 1)[0] != 0, offset + 1
+
     @classmethod
     def encode(cls, pybool: bool) -> bytearray:
         return bytearray([int(pybool)])
 
+    @classmethod
+    def encode_into(cls, pybool: bool, buf: bytearray, offset: int) -> int:
+        struct.pack_into('<?', buf, offset, pybool)
+        return offset + 1
+
+    @classmethod
+    def size_of(cls, pybool: bool) -> int:
+        return 1
+
 
 class Enum:
+    format = 'B'
+
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> int:
         return U8.decode(reader)
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[int, int]:
+        return U8.decode_buffer(data, offset)
+
     @classmethod
     def encode(cls, number: int) -> bytearray:
         return U8.encode(number)
 
+    @classmethod
+    def encode_into(cls, number: int, buf: bytearray, offset: int) -> int:
+        return U8.encode_into(number, buf, offset)
+
+    @classmethod
+    def size_of(cls, number: int) -> int:
+        return U8.size_of(number)
+
 
 class String:
     @classmethod
     def decode(cls, reader: typing.BinaryIO) -> str:
         return pxsol.io.read_full(reader, U32.decode(reader)).decode()
 
+    @classmethod
+    def decode_buffer(cls, data: memoryview, offset: int) -> typing.Tuple[str, int]:
+        n, offset = U32.decode_buffer(data, offset)
+        return str(pxsol.io.read_buffer(data, offset, n), 'utf-8'), offset + n
+
     @classmethod
     def encode(cls, string: str) -> bytearray:
         return U32.encode(len(string.encode())) + bytearray(string.encode())
 
+    @classmethod
+    def encode_into(cls, string: str, buf: bytearray, offset: int) -> int:
+        data = string.encode()
+        offset = U32.encode_into(len(data), buf, offset)
+        buf[offset:offset + len(data)] = data
+        return offset + len(data)
+
+    @classmethod
+    def size_of(cls, string: str) -> int:
+        return 4 + len(string.encode())
+
 
 class Array:
     def __init__(self, kype: typing.Any, size: int) -> None:
         self.kype = kype
         self.size = size
+        # The encoded size of an element, filled by field_index on first use.
+        self.stride: typing.Optional[int] = None
 
     def decode(self, reader: typing.BinaryIO) -> typing.List[typing.Any]:
         return [self.kype.decode(reader) for _ in range(self.size)]
 
+    def decode_buffer(self, data: memoryview, offset: int) -> typing.Tuple[typing.List[typing.Any], int]:
+        return decode_buffer_list(self.kype, self.size, data, offset)
+
+    def read_field(self, data: memoryview, path: str) -> typing.Any:
+        return read_field(self, data, path)
+
     def encode(self, pylist: typing.List[typing.Any]) -> bytearray:
-        return bytearray(itertools.chain(*[self.kype.encode(e) for e in pylist]))
+        r = bytearray(self.size_of(pylist))
+        self.encode_into(pylist, r, 0)
+        return r
+
+    def encode_into(self, pylist: typing.List[typing.Any], buf: bytearray, offset: int) -> int:
+        assert len(pylist) == self.size
+        return encode_into_list(self.kype, pylist, buf, offset)
+
+    def size_of(self, pylist: typing.List[typing.Any]) -> int:
+        return size_of_list(self.kype, pylist)
 
 
 class Slice:
@@ -196,20 +433,67 @@ class Slice:
     def decode(self, reader: typing.BinaryIO) -> typing.List[typing.Any]:
         return [self.kype.decode(reader) for _ in range(U32.decode(reader))]
 
+    def decode_buffer(self, data: memoryview, offset: int) -> typing.Tuple[typing.List[typing.Any], int]:
+        n, offset = U32.decode_buffer(data, offset)
+        return decode_buffer_list(self.kype, n, data, offset)
+
+    def iter_decode(self, reader: typing.BinaryIO) -> typing.Iterator[typing.Any]:
+        # Decode the elements one at a time. The reader is left at the end of the slice once the iterator is exhausted.
+        for _ in range(U32.decode(reader)):
+            yield self.kype.decode(reader)
+
+    def iter_decode_buffer(self, data: memoryview, offset: int) -> typing.Iterator[typing.Tuple[typing.Any, int]]:
+        # Decode the elements one at a time, each is yielded with the offset following it.
+        n, offset = U32.decode_buffer(data, offset)
+        for _ in range(n):
+            e, offset = self.kype.decode_buffer(data, offset)
+            yield e, offset
+
     def encode(self, pylist: typing.List[typing.Any]) -> bytearray:
-        return U32.encode(len(pylist)) + bytearray(itertools.chain(*[self.kype.encode(e) for e in pylist]))
+        r = bytearray(self.size_of(pylist))
+        self.encode_into(pylist, r, 0)
+        return r
+
+    def encode_into(self, pylist: typing.List[typing.Any], buf: bytearray, offset: int) -> int:
+        offset = U32.encode_into(len(pylist), buf, offset)
+        return encode_into_list(self.kype, pylist, buf, offset)
+
+    def size_of(self, pylist: typing.List[typing.Any]) -> int:
+        return 4 + size_of_list(self.kype, pylist)
 
 
 class Struct:
     def __init__(self, kype: typing.List[typing.Any]) -> None:
         self.kype = kype
+        # The offsets of the fields up to the first one with a variable size, filled by field_index on first use.
+        self.offset: typing.Optional[typing.List[int]] = None
 
     def decode(self, reader: typing.BinaryIO) -> typing.List[typing.Any]:
         return [kype.decode(reader) for kype in self.kype]
 
+    def decode_buffer(self, data: memoryview, offset: int) -> typing.Tuple[typing.List[typing.Any], int]:
+        r = []
+        for kype in self.kype:
+            e, offset = kype.decode_buffer(data, offset)
+            r.append(e)
+        return r, offset
+
+    def read_field(self, data: memoryview, path: str) -> typing.Any:
+        return read_field(self, data, path)
+
     def encode(self, pylist: typing.List[typing.Any]) -> bytearray:
+        r = bytearray(self.size_of(pylist))
+        self.encode_into(pylist, r, 0)
+        return r
+
+    def encode_into(self, pylist: typing.List[typing.Any], buf: bytearray, offset: int) -> int:
         assert len(pylist) == len(self.kype)
-        return bytearray(itertools.chain(*[e[0].encode(e[1]) for e in zip(self.kype, pylist)]))
+        for kype, e in zip(self.kype, pylist):
+            offset = kype.encode_into(e, buf, offset)
+        return offset
+
+    def size_of(self, pylist: typing.List[typing.Any]) -> int:
+        return sum([kype.size_of(e) for kype, e in zip(self.kype, pylist)])
 
 
 class Dict:
@@ -219,17 +503,51 @@ class Dict:
     def decode(self, reader: typing.BinaryIO) -> typing.Dict[typing.Any, typing.Any]:
         return dict([[self.kype[0].decode(reader), self.kype[1].decode(reader)] for _ in range(U32.decode(reader))])
 
+    def decode_buffer(self, data: memoryview, offset: int) -> typing.Tuple[typing.Dict[typing.Any, typing.Any], int]:
+        r = {}
+        n, offset = U32.decode_buffer(data, offset)
+        for _ in range(n):
+            k, offset = self.kype[0].decode_buffer(data, offset)
+            v, offset = self.kype[1].decode_buffer(data, offset)
+            r[k] = v
+        return r, offset
+
+    def iter_decode(self, reader: typing.BinaryIO) -> typing.Iterator[typing.Tuple[typing.Any, typing.Any]]:
+        # Decode the entries one at a time, as key value pairs. The reader is left at the end of the dict once the
+        # iterator is exhausted.
+        for _ in range(U32.decode(reader)):
+            yield self.kype[0].decode(reader), self.kype[1].decode(reader)
+
+    def iter_decode_buffer(
+        self,
+        data: memoryview,
+        offset: int,
+    ) -> typing.Iterator[typing.Tuple[typing.Tuple[typing.Any, typing.Any], int]]:
+        # Decode the entries one at a time, each key value pair is yielded with the offset following it.
+        n, offset = U32.decode_buffer(data, offset)
+        for _ in range(n):
+            k, offset = self.kype[0].decode_buffer(data, offset)
+            v, offset = self.kype[1].decode_buffer(data, offset)
+            yield (k, v), offset
+
     def encode(self, pydict: typing.Dict[typing.Any, typing.Any]) -> bytearray:
-        data = []
-        for k, v in pydict.items():
-            data.append([self.kype[0].encode(k), self.kype[1].encode(v)])
-        data.sort(key=lambda x: x[0])
-        r = U32.encode(len(data))
-        for e in data:
-            r.extend(e[0])
-            r.extend(e[1])
+        r = bytearray(self.size_of(pydict))
+        self.encode_into(pydict, r, 0)
         return r
 
+    def encode_into(self, pydict: typing.Dict[typing.Any, typing.Any], buf: bytearray, offset: int) -> int:
+        # Entries are ordered by their encoded keys.
+        data = [[self.kype[0].encode(k), v] for k, v in pydict.items()]
+        data.sort(key=lambda x: x[0])
+        offset = U32.encode_into(len(data), buf, offset)
+        for k, v in data:
+            buf[offset:offset + len(k)] = k
+            offset = self.kype[1].encode_into(v, buf, offset + len(k))
+        return offset
+
+    def size_of(self, pydict: typing.Dict[typing.Any, typing.Any]) -> int:
+        return 4 + sum([self.kype[0].size_of(k) + self.kype[1].size_of(v) for k, v in pydict.items()])
+
 
 class Option:
     def __init__(self, kype: typing.Any) -> None:
@@ -238,10 +556,24 @@ class Option:
     def decode(self, reader: typing.BinaryIO) -> typing.Optional[typing.Any]:
         return self.kype.decode(reader) if U8.decode(reader) != 0 else None
 
+    def decode_buffer(self, data: memoryview, offset: int) -> typing.Tuple[typing.Optional[typing.Any], int]:
+        some, offset = U8.decode_buffer(data, offset)
+        return self.kype.decode_buffer(data, offset) if some != 0 else (None, offset)
+
     def encode(self, pydata: typing.Optional[typing.Any]) -> bytearray:
-        if pydata is not None:
-            return bytearray([1]) + self.kype.encode(pydata)
-        return bytearray([0])
+        r = bytearray(self.size_of(pydata))
+        self.encode_into(pydata, r, 0)
+        return r
+
+    def encode_into(self, pydata: typing.Optional[typing.Any], buf: bytearray, offset: int) -> int:
+        if pydata is None:
+            buf[offset] = 0
+            return offset + 1
+        buf[offset] = 1
+        return self.kype.encode_into(pydata, buf, offset + 1)
+
+    def size_of(self, pydata: typing.Optional[typing.Any]) -> int:
+        return 1 if pydata is None else 1 + self.kype.size_of(pydata)
 
 
 class Custom:
@@ -251,5 +583,405 @@ class Custom:
     def decode(self, reader: typing.BinaryIO) -> typing.Any:
         return self.func(reader)
 
+    def decode_buffer(self, data: memoryview, offset: int) -> typing.Tuple[typing.Any, int]:
+        # Custom decoders are written against a reader, so they are given a reader over the rest of the data.
+        reader = pxsol.io.BufferReader(data, offset)
+        return self.func(reader), reader.offset
+
     def encode(self, pydata: bytearray) -> bytearray:
         return pydata
+
+    def encode_into(self, pydata: bytearray, buf: bytearray, offset: int) -> int:
+        buf[offset:offset + len(pydata)] = pydata
+        return offset + len(pydata)
+
+    def size_of(self, pydata: bytearray) -> int:
+        return len(pydata)
+
+
+def decode_buffer_list(kype: typing.Any, size: int, data: memoryview, offset: int) -> typing.Tuple[typing.List, int]:
+    # Decode size consecutive elements of a type. A run of u8 is taken from the data in a single slice.
+    if kype is U8:
+        return list(pxsol.io.read_buffer(data, offset, size)), offset + size
+    r = []
+    for _ in range(size):
+        e, offset = kype.decode_buffer(data, offset)
+        r.append(e)
+    return r, offset
+
+
+def encode_into_list(kype: typing.Any, pylist: typing.List[typing.Any], buf: bytearray, offset: int) -> int:
+    # Encode consecutive elements of a type. A run of u8 is written in a single slice assignment.
+    if kype is U8:
+        buf[offset:offset + len(pylist)] = pylist
+        return offset + len(pylist)
+    for e in pylist:
+        offset = kype.encode_into(e, buf, offset)
+    return offset
+
+
+def size_of_list(kype: typing.Any, pylist: typing.List[typing.Any]) -> int:
+    # Get the encoded size of consecutive elements of a type.
+    n = fixed_size(kype)
+    if n is not None:
+        return n * len(pylist)
+    return sum([kype.size_of(e) for e in pylist])
+
+
+class Compiled:
+    # A type compiled by compile. It decodes and encodes exactly like the type it was compiled from, through closures
+    # that were specialised for the schema once.
+
+    def __init__(
+        self,
+        kype: typing.Any,
+        enc: typing.Callable[[bytearray, typing.Any], None],
+        dec: typing.Callable[[typing.BinaryIO], typing.Any],
+        dec_buffer: typing.Callable[[memoryview, int], typing.Tuple[typing.Any, int]],
+    ) -> None:
+        self.kype = kype
+        self.enc = enc
+        self.dec = dec
+        self.dec_buffer = dec_buffer
+
+    def decode(self, reader: typing.BinaryIO) -> typing.Any:
+        return self.dec(reader)
+
+    def decode_buffer(self, data: memoryview, offset: int) -> typing.Tuple[typing.Any, int]:
+        # The closures unpack with struct directly, a truncated input is reported as EOFError here, like the other
+        # decoders do.
+        try:
+            return self.dec_buffer(data, offset)
+        except struct.error as e:
+            raise EOFError('io: EOF') from e
+
+    def encode(self, pydata: typing.Any) -> bytearray:
+        r = bytearray()
+        self.enc(r, pydata)
+        return r
+
+    def encode_into(self, pydata: typing.Any, buf: bytearray, offset: int) -> int:
+        r = self.encode(pydata)
+        buf[offset:offset + len(r)] = r
+        return offset + len(r)
+
+    def size_of(self, pydata: typing.Any) -> int:
+        return self.kype.size_of(pydata)
+
+
+def compile(kype: typing.Any) -> Compiled:
+    # Compile a type into closures specialised for it. The schema is walked only once. Runs of adjacent fixed size
+    # fields in a struct are packed and unpacked by a single precompiled struct.Struct, and encoding appends everything
+    # to a single bytearray instead of joining the encodings of the fields.
+    if isinstance(kype, Compiled):
+        return kype
+    if hasattr(kype, 'format'):
+        return compile_format(kype, struct.Struct('<' + kype.format))
+    if isinstance(kype, Array):
+        return compile_array(kype)
+    if isinstance(kype, Slice):
+        return compile_slice(kype)
+    if isinstance(kype, Struct):
+        return compile_struct(kype)
+    if isinstance(kype, Dict):
+        return compile_dict(kype)
+    if isinstance(kype, Option):
+        return compile_option(kype)
+    # U128, I128, String and custom types.
+    return Compiled(kype, lambda r, v: r.extend(kype.encode(v)), kype.decode, kype.decode_buffer)
+
+
+def compile_format(kype: typing.Any, s: struct.Struct) -> Compiled:
+    def dec(reader: typing.BinaryIO) -> typing.Any:
+        return s.unpack(pxsol.io.read_full(reader, s.size))[0]
+
+    def dec_buffer(data: memoryview, offset: int) -> typing.Tuple[typing.Any, int]:
+        return s.unpack_from(data, offset)[0], offset + s.size
+    return Compiled(kype, lambda r, v: r.extend(s.pack(v)), dec, dec_buffer)
+
+
+def compile_list(kype: typing.Any) -> typing.Tuple[
+    typing.Callable[[bytearray, typing.List[typing.Any]], None],
+    typing.Callable[[typing.BinaryIO, int], typing.List[typing.Any]],
+    typing.Callable[[memoryview, int, int], typing.Tuple[typing.List[typing.Any], int]],
+]:
+    # Compile the encoder and the decoders of a run of elements of the same type, for arrays and slices. A run of u8
+    # is copied at once, a run of other fixed size elements is packed and unpacked by one call to struct.
+    if kype is U8:
+        def enc(r: bytearray, v: typing.List[int]) -> None:
+            r.extend(v)
+
+        def dec(reader: typing.BinaryIO, n: int) -> typing.List[int]:
+            return list(pxsol.io.read_full(reader, n))
+
+        def dec_buffer(data: memoryview, offset: int, n: int) -> typing.Tuple[typing.List[int], int]:
+            return list(pxsol.io.read_buffer(data, offset, n)), offset + n
+        return enc, dec, dec_buffer
+    if hasattr(kype, 'format'):
+        f = kype.format
+        size = struct.calcsize(f)
+
+        def enc(r: bytearray, v: typing.List[typing.Any]) -> None:
+            r.extend(struct.pack(f'<{len(v)}{f}', *v))
+
+        def dec(reader: typing.BinaryIO, n: int) -> typing.List[typing.Any]:
+            return list(struct.unpack(f'<{n}{f}', pxsol.io.read_full(reader, n * size)))
+
+        def dec_buffer(data: memoryview, offset: int, n: int) -> typing.Tuple[typing.List[typing.Any], int]:
+            return list(struct.unpack_from(f'<{n}{f}', data, offset)), offset + n * size
+        return enc, dec, dec_buffer
+    c = compile(kype)
+
+    def enc(r: bytearray, v: typing.List[typing.Any]) -> None:
+        for e in v:
+            c.enc(r, e)
+
+    def dec(reader: typing.BinaryIO, n: int) -> typing.List[typing.Any]:
+        return [c.dec(reader) for _ in range(n)]
+
+    def dec_buffer(data: memoryview, offset: int, n: int) -> typing.Tuple[typing.List[typing.Any], int]:
+        r = []
+        for _ in range(n):
+            e, offset = c.dec_buffer(data, offset)
+            r.append(e)
+        return r, offset
+    return enc, dec, dec_buffer
+
+
+def compile_array(kype: Array) -> Compiled:
+    enc_list, dec_list, dec_list_buffer = compile_list(kype.kype)
+    size = kype.size
+
+    def enc(r: bytearray, v: typing.List[typing.Any]) -> None:
+        assert len(v) == size
+        enc_list(r, v)
+    return Compiled(kype, enc, lambda reader: dec_list(reader, size), lambda d, o: dec_list_buffer(d, o, size))
+
+
+def compile_slice(kype: Slice) -> Compiled:
+    enc_list, dec_list, dec_list_buffer = compile_list(kype.kype)
+    n = struct.Struct('<I')
+
+    def enc(r: bytearray, v: typing.List[typing.Any]) -> None:
+        r.extend(n.pack(len(v)))
+        enc_list(r, v)
+
+    def dec(reader: typing.BinaryIO) -> typing.List[typing.Any]:
+        return dec_list(reader, n.unpack(pxsol.io.read_full(reader, n.size))[0])
+
+    def dec_buffer(data: memoryview, offset: int) -> typing.Tuple[typing.List[typing.Any], int]:
+        return dec_list_buffer(data, offset + n.size, n.unpack_from(data, offset)[0])
+    return Compiled(kype, enc, dec, dec_buffer)
+
+
+def compile_struct(kype: Struct) -> Compiled:
+    # The fields are split into steps. A step is either a run of adjacent fixed size fields, which share one
+    # struct.Struct, or a single compiled field.
+    step: typing.List[typing.Tuple[int, int, typing.Optional[struct.Struct], typing.Optional[Compiled]]] = []
+    i = 0
+    while i < len(kype.kype):
+        j = i
+        while j < len(kype.kype) and hasattr(kype.kype[j], 'format'):
+            j += 1
+        if j > i:
+            step.append((i, j, struct.Struct('<' + ''.join([e.format for e in kype.kype[i:j]])), None))
+            i = j
+            continue
+        step.append((i, i + 1, None, compile(kype.kype[i])))
+        i += 1
+    size = len(kype.kype)
+
+    def enc(r: bytearray, v: typing.List[typing.Any]) -> None:
+        assert len(v) == size
+        for i, j, s, c in step:
+            if s is not None:
+                r.extend(s.pack(*v[i:j]))
+            else:
+                c.enc(r, v[i])
+
+    def dec(reader: typing.BinaryIO) -> typing.List[typing.Any]:
+        r = []
+        for _, _, s, c in step:
+            if s is not None:
+                r.extend(s.unpack(pxsol.io.read_full(reader, s.size)))
+            else:
+                r.append(c.dec(reader))
+        return r
+
+    def dec_buffer(data: memoryview, offset: int) -> typing.Tuple[typing.List[typing.Any], int]:
+        r = []
+        for _, _, s, c in step:
+            if s is not None:
+                r.extend(s.unpack_from(data, offset))
+                offset += s.size
+            else:
+                e, offset = c.dec_buffer(data, offset)
+                r.append(e)
+        return r, offset
+    return Compiled(kype, enc, dec, dec_buffer)
+
+
+def compile_dict(kype: Dict) -> Compiled:
+    k = compile(kype.kype[0])
+    v = compile(kype.kype[1])
+    n = struct.Struct('<I')
+
+    def enc(r: bytearray, pydict: typing.Dict[typing.Any, typing.Any]) -> None:
+        data = []
+        for a, b in pydict.items():
+            e = bytearray()
+            k.enc(e, a)
+            data.append((e, b))
+        data.sort(key=lambda x: x[0])
+        r.extend(n.pack(len(data)))
+        for a, b in data:
+            r.extend(a)
+            v.enc(r, b)
+
+    def dec(reader: typing.BinaryIO) -> typing.Dict[typing.Any, typing.Any]:
+        return dict([[k.dec(reader), v.dec(reader)] for _ in range(n.unpack(pxsol.io.read_full(reader, n.size))[0])])
+
+    def dec_buffer(data: memoryview, offset: int) -> typing.Tuple[typing.Dict[typing.Any, typing.Any], int]:
+        r = {}
+        size = n.unpack_from(data, offset)[0]
+        offset += n.size
+        for _ in range(size):
+            a, offset = k.dec_buffer(data, offset)
+            b, offset = v.dec_buffer(data, offset)
+            r[a] = b
+        return r, offset
+    return Compiled(kype, enc, dec, dec_buffer)
+
+
+def compile_option(kype: Option) -> Compiled:
+    c = compile(kype.kype)
+
+    def enc(r: bytearray, v: typing.Optional[typing.Any]) -> None:
+        if v is None:
+            r.append(0)
+            return
+        r.append(1)
+        c.enc(r, v)
+
+    def dec(reader: typing.BinaryIO) -> typing.Optional[typing.Any]:
+        return c.dec(reader) if pxsol.io.read_full(reader, 1)[0] != 0 else None
+
+    def dec_buffer(data: memoryview, offset: int) -> typing.Tuple[typing.Optional[typing.Any], int]:
+        return c.dec_buffer(data, offset + 1) if pxsol.io.read_buffer(data, offset, 1)[0] != 0 else (None, offset + 1)
+    return Compiled(kype, enc, dec, dec_buffer)
+
+
+def fixed_size(kype: typing.Any) -> typing.Optional[int]:
+    # Get the encoded size of a type if it is the same for every value, otherwise None.
+    if isinstance(kype, Compiled):
+        return fixed_size(kype.kype)
+    if hasattr(kype, 'format'):
+        return struct.calcsize('<' + kype.format)
+    if kype is U128 or kype is I128:
+        return 16
+    if isinstance(kype, Array):
+        n = fixed_size(kype.kype)
+        return None if n is None else n * kype.size
+    if isinstance(kype, Struct):
+        n = [fixed_size(e) for e in kype.kype]
+        return None if None in n else sum(n)
+    return None
+
+
+def field_index(kype: typing.Any, i: int) -> typing.Tuple[int, typing.Any]:
+    # Get the offset and the type of the i-th field of a struct or the i-th element of an array. Every field in front
+    # of it must have a fixed size. The layout is stored on the schema itself the first time it is analysed.
+    if isinstance(kype, Compiled):
+        return field_index(kype.kype, i)
+    if isinstance(kype, Array):
+        assert i >= 0 and i < kype.size
+        if kype.stride is None:
+            kype.stride = fixed_size(kype.kype)
+        assert kype.stride is not None
+        return kype.stride * i, kype.kype
+    assert isinstance(kype, Struct)
+    assert i >= 0 and i < len(kype.kype)
+    if kype.offset is None:
+        offset = [0]
+        for e in kype.kype:
+            n = fixed_size(e)
+            if n is None:
+                break
+            offset.append(offset[-1] + n)
+        kype.offset = offset
+    assert i < len(kype.offset)
+    return kype.offset[i], kype.kype[i]
+
+
+def field(kype: typing.Any, path: str) -> typing.Tuple[int, typing.Any]:
+    # Get the offset and the type of a field. The path is a dotted list of indexes into structs and arrays, for example
+    # '3.1' is the second field of the fourth field.
+    offset = 0
+    for e in path.split('.'):
+        n, kype = field_index(kype, int(e))
+        offset += n
+    return offset, kype
+
+
+def read_field(kype: typing.Any, data: memoryview, path: str) -> typing.Any:
+    # Decode a single field of the encoded data, without decoding the fields around it.
+    offset, kype = field(kype, path)
+    return kype.decode_buffer(data, offset)[0]
+
+
+class View:
+    # A lazy view of an encoded struct or array. Fields are decoded when they are accessed, fields which are structs or
+    # arrays themselves are returned as views.
+
+    def __init__(self, kype: typing.Any, data: memoryview, offset: int) -> None:
+        self.kype = kype.kype if isinstance(kype, Compiled) else kype
+        assert isinstance(self.kype, (Array, Struct))
+        self.data = data
+        self.offset = offset
+
+    def __getitem__(self, i: int) -> typing.Any:
+        offset, kype = field_index(self.kype, i)
+        if isinstance(kype, (Array, Struct)):
+            return View(kype, self.data, self.offset + offset)
+        return kype.decode_buffer(self.data, self.offset + offset)[0]
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __len__(self) -> int:
+        return self.kype.size if isinstance(self.kype, Array) else len(self.kype.kype)
+
+    def decode(self) -> typing.List[typing.Any]:
+        return self.kype.decode_buffer(self.data, self.offset)[0]
+
+
+def numpy_dtype(kype: typing.Any) -> typing.Any:
+    # Get the numpy dtype of a fixed size type. Struct fields are named f0, f1 and so on, arrays become subarrays, so a
+    # public key stored as an array of 32 u8 becomes a (32,) uint8 column. Numpy is an optional dependency, install it
+    # with the numpy extra.
+    import numpy
+    if isinstance(kype, Compiled):
+        return numpy_dtype(kype.kype)
+    if hasattr(kype, 'format'):
+        return numpy.dtype('<' + kype.format)
+    if kype is U128 or kype is I128:
+        # Numpy has no 128-bit integers, the raw little endian bytes are kept.
+        return numpy.dtype((numpy.uint8, (16,)))
+    if isinstance(kype, Array):
+        return numpy.dtype((numpy_dtype(kype.kype), (kype.size,)))
+    assert isinstance(kype, Struct)
+    return numpy.dtype([(f'f{i}', numpy_dtype(e)) for i, e in enumerate(kype.kype)])
+
+
+def numpy_decode(kype: typing.Any, data: typing.Iterable[bytearray]) -> typing.Any:
+    # Decode a batch of encoded values which share a fixed size type into a numpy structured array, one row per value.
+    # Trailing bytes of a value beyond the size of the type are ignored, as accounts may be larger than their layout.
+    import numpy
+    dtype = numpy_dtype(kype)
+    size = dtype.itemsize
+    buf = bytearray()
+    for e in data:
+        assert len(e) >= size
+        buf.extend(memoryview(e)[:size])
+    return numpy.frombuffer(buf, dtype=dtype)
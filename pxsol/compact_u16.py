@@ -44,6 +44,18 @@ def encode(n: int) -> bytearray:
     raise Exception
 
 
+def encode_into(n: int, buf: bytearray, offset: int) -> int:
+    # Encode into a buffer at offset, returning the offset following the encoded bytes.
+    data = encode(n)
+    buf[offset:offset + len(data)] = data
+    return offset + len(data)
+
+
+def encode_size(n: int) -> int:
+    # Get the number of bytes used to encode n.
+    return 1 if n <= 0x7f else 2 if n <= 0x3fff else 3
+
+
 def decode(data: bytearray) -> int:
     # Decode from a buffer. Raises EOFError or AssertionError on invalid data.
     assert len(data) <= 3
@@ -67,3 +79,23 @@ def decode_reader(reader: typing.BinaryIO) -> int:
     assert c <= 0x03
     n += c << 14
     return n
+
+
+def decode_buffer(data: memoryview, offset: int) -> typing.Tuple[int, int]:
+    # Decode from a buffer at offset, returning the value and the offset following it. Raises EOFError or
+    # AssertionError on invalid data.
+    c = pxsol.io.read_buffer(data, offset, 1)[0]
+    if c <= 0x7f:
+        return c, offset + 1
+    n = c & 0x7f
+    c = pxsol.io.read_buffer(data, offset + 1, 1)[0]
+    assert c != 0x00
+    m = c & 0x7f
+    n += m << 7
+    if c <= 0x7f:
+        return n, offset + 2
+    c = pxsol.io.read_buffer(data, offset + 2, 1)[0]
+    assert c != 0x00
+    assert c <= 0x03
+    n += c << 14
+    return n, offset + 3
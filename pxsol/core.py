@@ -1,10 +1,17 @@
+import collections
+import concurrent.futures
 import hashlib
 import io
+import itertools
 import json
+import os
+import pathlib
 import pxsol.base58
 import pxsol.compact_u16
+import pxsol.ed25519
 import pxsol.eddsa
 import secrets
+import threading
 import typing
 
 
@@ -17,6 +24,7 @@ class PriKey:
         assert isinstance(p, bytearray)
         assert len(p) == 32
         self.p = p
+        self.cache: typing.Optional[typing.Tuple[bytes, pxsol.ed25519.Fr, bytearray, bytearray]] = None
 
     def __eq__(self, other) -> bool:
         return self.p == other.p
@@ -34,12 +42,20 @@ class PriKey:
     @classmethod
     def base58_decode(cls, data: str) -> PriKey:
         # Convert the base58 representation to private key.
-        return PriKey(pxsol.base58.decode(data))
+        return PriKey(pxsol.base58.decode32(data))
 
     def hex(self) -> str:
         # Convert the private key to hex representation.
         return self.p.hex()
 
+    def expand(self) -> typing.Tuple[pxsol.ed25519.Fr, bytearray, bytearray]:
+        # Get the secret scalar, the nonce prefix and the encoded public key. They are computed on first use and cached,
+        # so signing repeatedly with the same key costs one scalar multiplication per signature.
+        if self.cache is None or self.cache[0] != self.p:
+            a, prefix = pxsol.eddsa.expand(self.p)
+            self.cache = (bytes(self.p), a, prefix, pxsol.eddsa.pt_encode(pxsol.ed25519.G * a))
+        return self.cache[1], self.cache[2], self.cache[3]
+
     @classmethod
     def hex_decode(cls, data: str) -> PriKey:
         # Convert the hex representation to private key.
@@ -59,7 +75,7 @@ class PriKey:
 
     def pubkey(self) -> PubKey:
         # Get the eddsa public key corresponding to the private key.
-        return PubKey(pxsol.eddsa.pubkey(self.p))
+        return PubKey(bytearray(self.expand()[2]))
 
     @classmethod
     def random(cls) -> PriKey:
@@ -67,7 +83,8 @@ class PriKey:
 
     def sign(self, data: bytearray) -> bytearray:
         # Sign a message of arbitrary length. Unlike secp256k1, the resulting signature is deterministic.
-        return pxsol.eddsa.sign(self.p, data)
+        a, prefix, pubkey = self.expand()
+        return pxsol.eddsa.sign_expand(a, prefix, pubkey, data)
 
     def wif(self) -> str:
         # Convert the private key to wallet import format. This is the format supported by most third-party wallets.
@@ -77,7 +94,7 @@ class PriKey:
     @classmethod
     def wif_decode(cls, data: str) -> PriKey:
         # Convert the wallet import format to private key. This is the format supported by most third-party wallets.
-        pripub = pxsol.base58.decode(data)
+        pripub = pxsol.base58.decode64(data)
         prikey = PriKey(pripub[:32])
         pubkey = PubKey(pripub[32:])
         assert prikey.pubkey() == pubkey
@@ -86,30 +103,42 @@ class PriKey:
 
 class PubKey:
     # Solana's public key is a 32-byte array. The base58 representation of the public key is also referred to as the
-    # address.
+    # address. Public keys are immutable: the bytes are stored as a bytes object, whose hash python computes once and
+    # keeps, and the base58 representation is computed on first use and kept as well.
+
+    __slots__ = ['p', 's']
 
     def __init__(self, p: bytearray) -> None:
-        assert isinstance(p, bytearray)
+        assert isinstance(p, (bytes, bytearray))
         assert len(p) == 32
-        self.p = p
+        object.__setattr__(self, 'p', bytes(p))
+        object.__setattr__(self, 's', None)
 
     def __eq__(self, other) -> bool:
         return self.p == other.p
 
     def __hash__(self) -> int:
-        return self.int()
+        return hash(self.p)
+
+    def __reduce__(self) -> typing.Tuple[type, typing.Tuple[bytes]]:
+        return PubKey, (self.p,)
 
     def __repr__(self) -> str:
         return json.dumps(self.json())
 
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
     def base58(self) -> str:
         # Convert the public key to base58 representation.
-        return pxsol.base58.encode(self.p)
+        if self.s is None:
+            object.__setattr__(self, 's', pxsol.base58.encode(self.p))
+        return self.s
 
     @classmethod
     def base58_decode(cls, data: str) -> PubKey:
         # Convert the base58 representation to public key.
-        return PubKey(pxsol.base58.decode(data))
+        return PubKey(pxsol.base58.decode32(data))
 
     def derive(self, seed: bytearray, host: PubKey) -> PubKey:
         # Create new pubkey with seed and host.
@@ -120,22 +149,28 @@ class PubKey:
         assert not data.endswith(bytearray('ProgramDerivedAddress'.encode()))
         return PubKey(bytearray(hashlib.sha256(data).digest()))
 
-    def derive_pda(self, seed: bytearray) -> typing.Tuple[PubKey, int]:
-        # Program Derived Address (PDA). PDAs are addresses derived deterministically using a combination of
-        # user-defined seeds, a bump seed, and a program's ID.
-        # See: https://solana.com/docs/core/pda
+    def create_pda(self, seed: bytearray, bump: int) -> PubKey:
+        # Create a program derived address when the bump is already known, which costs a single hash and a single curve
+        # check instead of a bump search. Also known as create_program_address.
         data = bytearray()
         data.extend(seed)
-        data.append(0xff)
+        data.append(bump)
         data.extend(self.p)
         data.extend(bytearray('ProgramDerivedAddress'.encode()))
-        for i in range(255, -1, -1):
-            data[len(seed)] = i
-            hash = bytearray(hashlib.sha256(data).digest())
-            # The pda should fall off the ed25519 curve.
-            if not pxsol.eddsa.pt_exists(hash):
-                return PubKey(hash), i
-        raise Exception
+        hash = bytearray(hashlib.sha256(data).digest())
+        assert not pxsol.eddsa.pt_exists(hash)
+        return PubKey(hash)
+
+    def derive_pda(self, seed: bytearray) -> typing.Tuple[PubKey, int]:
+        # Program Derived Address (PDA). PDAs are addresses derived deterministically using a combination of
+        # user-defined seeds, a bump seed, and a program's ID. Results are remembered in pda_cache.
+        # See: https://solana.com/docs/core/pda
+        pda = pda_cache.get(self, seed)
+        if pda is not None:
+            return pda
+        hash, bump = derive_pda_search(self.p, bytes(seed))
+        pda_cache.put(self, seed, (PubKey(bytearray(hash)), bump))
+        return PubKey(bytearray(hash)), bump
 
     def hex(self) -> str:
         # Convert the public key to hex representation.
@@ -155,10 +190,150 @@ class PubKey:
         # Convert the u256 number to public key, in big endian.
         return PubKey(bytearray(data.to_bytes(32)))
 
+    def intern(self) -> PubKey:
+        # Get the shared instance of this public key from the intern table, registering this one if there is none.
+        return pubkey_intern.setdefault(self.p, self)
+
     def json(self) -> str:
         return self.base58()
 
 
+def derive_pda_search(program: bytes, seed: bytes) -> typing.Tuple[bytes, int]:
+    # Search the bump of a program derived address, from 255 downward, and returns the first hash that falls off the
+    # ed25519 curve. The seed is absorbed into the hash state once and the state is copied for each bump; the bump, the
+    # program id and the suffix come after the seed in the hash input, so they are hashed for every candidate.
+    seed_hash = hashlib.sha256(seed)
+    tail = program + b'ProgramDerivedAddress'
+    for i in range(255, -1, -1):
+        h = seed_hash.copy()
+        h.update(bytes([i]))
+        h.update(tail)
+        hash = h.digest()
+        # The pda should fall off the ed25519 curve.
+        if not pxsol.eddsa.pt_exists(bytearray(hash)):
+            return hash, i
+    raise Exception
+
+
+def derive_pda_search_many(program: bytes, seed: typing.List[bytes]) -> typing.List[typing.Tuple[bytes, int]]:
+    # Search the bumps of a chunk of seeds. This is the unit of work sent to the workers of derive_pda_many.
+    return [derive_pda_search(program, e) for e in seed]
+
+
+def derive_pda_many(
+    program: PubKey,
+    seed: typing.Iterable[bytearray],
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> typing.Iterator[typing.Tuple[PubKey, int]]:
+    # Derive the program derived addresses of many seeds in parallel. Seeds are sent to the executor in chunks, and the
+    # results are yielded in input order as soon as they are ready, so an input of any length is processed with bounded
+    # memory. A process pool with one worker per core is used by default, a concurrent.futures.InterpreterPoolExecutor
+    # works as well. The results bypass pda_cache.
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            yield from derive_pda_many(program, seed, executor)
+        return
+    todo: collections.deque[concurrent.futures.Future] = collections.deque()
+    for chunk in itertools.batched(seed, 256):
+        todo.append(executor.submit(derive_pda_search_many, program.p, [bytes(e) for e in chunk]))
+        if len(todo) >= 4 * (os.cpu_count() or 1):
+            for e in todo.popleft().result():
+                yield PubKey(bytearray(e[0])), e[1]
+    for f in todo:
+        for e in f.result():
+            yield PubKey(bytearray(e[0])), e[1]
+
+
+def derive_ata_many(
+    owner: typing.Iterable[PubKey],
+    mint: PubKey,
+    host: PubKey,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> typing.Iterator[typing.Tuple[PubKey, int]]:
+    # Derive the associated token accounts of many owners for the same mint in parallel, see derive_pda_many. The host
+    # is the token program that owns the mint.
+    # See: https://solana.com/docs/core/tokens#associated-token-account.
+    program = pxsol.program.AssociatedTokenAccount.pubkey
+    yield from derive_pda_many(program, (e.p + host.p + mint.p for e in owner), executor)
+
+
+class PdaCache:
+    # A bounded lru cache of program derived addresses, keyed by program and seed. The cache can be persisted to a json
+    # file, so that a restarted service does not need to search the bumps again.
+
+    def __init__(self, size: int, path: typing.Optional[str] = None) -> None:
+        assert size > 0
+        self.data: collections.OrderedDict[typing.Tuple[bytes, bytes], typing.Tuple[bytes, int]]
+        self.data = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.path = path
+        self.size = size
+        if path is not None and pathlib.Path(path).exists():
+            self.load()
+
+    def get(self, program: PubKey, seed: bytearray) -> typing.Optional[typing.Tuple[PubKey, int]]:
+        # Returns the cached address and bump, or none.
+        k = (program.p, bytes(seed))
+        with self.lock:
+            v = self.data.get(k)
+            if v is None:
+                return None
+            self.data.move_to_end(k)
+        return PubKey(bytearray(v[0])), v[1]
+
+    def load(self) -> None:
+        # Load entries from the json file. The file is not trusted: each entry is searched again with derive_pda_search,
+        # and entries whose address or bump differ from the canonical ones, or that do not parse, are dropped. Checking
+        # the address alone is not enough, any bump whose hash falls off the curve gives a valid looking address. A
+        # stale or tampered file thus never makes derive_pda return a wrong address.
+        assert self.path is not None
+        try:
+            data = json.loads(pathlib.Path(self.path).read_text())
+            assert isinstance(data, list)
+        except (AssertionError, ValueError):
+            return
+        for e in data:
+            try:
+                program = PubKey.base58_decode(e[0])
+                seed = bytearray.fromhex(e[1])
+                pda = PubKey.base58_decode(e[2])
+                assert isinstance(e[3], int) and 0 <= e[3] <= 255
+                assert derive_pda_search(program.p, bytes(seed)) == (bytes(pda.p), e[3])
+            except (AssertionError, IndexError, KeyError, TypeError, ValueError):
+                continue
+            self.put(program, seed, (pda, e[3]))
+
+    def put(self, program: PubKey, seed: bytearray, pda: typing.Tuple[PubKey, int]) -> None:
+        # Add an entry, evicting the least recently used one if the cache is full.
+        k = (program.p, bytes(seed))
+        with self.lock:
+            self.data[k] = (pda[0].p, pda[1])
+            self.data.move_to_end(k)
+            if len(self.data) > self.size:
+                self.data.popitem(last=False)
+
+    def save(self) -> None:
+        # Save all entries to the json file, from the least to the most recently used.
+        assert self.path is not None
+        with self.lock:
+            data = [[
+                pxsol.base58.encode(k[0]),
+                k[1].hex(),
+                pxsol.base58.encode(v[0]),
+                v[1],
+            ] for k, v in self.data.items()]
+        pathlib.Path(self.path).write_text(json.dumps(data))
+
+
+# The process wide pda cache used by PubKey.derive_pda. Replace it with PdaCache(size, path) to change its capacity or
+# to persist it on disk.
+pda_cache = PdaCache(4096)
+
+# Intern table of public keys, keyed by their bytes. The well-known program ids register themselves here, and decoded
+# messages reuse the registered instances instead of allocating a new key for every reference to a program.
+pubkey_intern: typing.Dict[bytes, PubKey] = {}
+
+
 class AccountMeta:
     # Describes a single account with it's mode. The bit 0 distinguishes whether the account is writable; the bit 1
     # distinguishes whether the account needs to be signed. Details are as follows:
@@ -206,14 +381,24 @@ class AddressTableLookup:
         }
 
     def serialize(self) -> bytearray:
-        r = bytearray()
-        r.extend(self.account_key.p)
-        r.extend(pxsol.compact_u16.encode(len(self.writable_indexes)))
-        r.extend(bytearray(self.writable_indexes))
-        r.extend(pxsol.compact_u16.encode(len(self.readonly_indexes)))
-        r.extend(bytearray(self.readonly_indexes))
+        r = bytearray(self.serialize_size())
+        self.serialize_into(r, 0)
         return r
 
+    def serialize_into(self, buf: bytearray, offset: int) -> int:
+        buf[offset:offset + 32] = self.account_key.p
+        offset = pxsol.compact_u16.encode_into(len(self.writable_indexes), buf, offset + 32)
+        buf[offset:offset + len(self.writable_indexes)] = bytes(self.writable_indexes)
+        offset += len(self.writable_indexes)
+        offset = pxsol.compact_u16.encode_into(len(self.readonly_indexes), buf, offset)
+        buf[offset:offset + len(self.readonly_indexes)] = bytes(self.readonly_indexes)
+        return offset + len(self.readonly_indexes)
+
+    def serialize_size(self) -> int:
+        w = len(self.writable_indexes)
+        r = len(self.readonly_indexes)
+        return 32 + pxsol.compact_u16.encode_size(w) + w + pxsol.compact_u16.encode_size(r) + r
+
     @classmethod
     def serialize_decode(cls, data: bytearray) -> AddressTableLookup:
         return AddressTableLookup.serialize_decode_reader(io.BytesIO(data))
@@ -269,15 +454,23 @@ class Instruction:
         }
 
     def serialize(self) -> bytearray:
-        r = bytearray()
-        r.append(self.program)
-        r.extend(pxsol.compact_u16.encode(len(self.account)))
-        for e in self.account:
-            r.append(e)
-        r.extend(pxsol.compact_u16.encode(len(self.data)))
-        r.extend(self.data)
+        r = bytearray(self.serialize_size())
+        self.serialize_into(r, 0)
         return r
 
+    def serialize_into(self, buf: bytearray, offset: int) -> int:
+        buf[offset] = self.program
+        offset = pxsol.compact_u16.encode_into(len(self.account), buf, offset + 1)
+        buf[offset:offset + len(self.account)] = bytes(self.account)
+        offset = pxsol.compact_u16.encode_into(len(self.data), buf, offset + len(self.account))
+        buf[offset:offset + len(self.data)] = self.data
+        return offset + len(self.data)
+
+    def serialize_size(self) -> int:
+        a = len(self.account)
+        d = len(self.data)
+        return 1 + pxsol.compact_u16.encode_size(a) + a + pxsol.compact_u16.encode_size(d) + d
+
     @classmethod
     def serialize_decode(cls, data: bytearray) -> Instruction:
         return Instruction.serialize_decode_reader(io.BytesIO(data))
@@ -313,6 +506,13 @@ class MessageHeader:
     def serialize(self) -> bytearray:
         return bytearray([self.required_signatures, self.readonly_signatures, self.readonly])
 
+    def serialize_into(self, buf: bytearray, offset: int) -> int:
+        buf[offset:offset + 3] = bytes([self.required_signatures, self.readonly_signatures, self.readonly])
+        return offset + 3
+
+    def serialize_size(self) -> int:
+        return 3
+
     @classmethod
     def serialize_decode(cls, data: bytearray) -> MessageHeader:
         assert len(data) == 3
@@ -350,16 +550,31 @@ class Message:
         }
 
     def serialize(self) -> bytearray:
-        r = bytearray()
-        r.extend(self.header.serialize())
-        r.extend(pxsol.compact_u16.encode(len(self.account_keys)))
+        r = bytearray(self.serialize_size())
+        self.serialize_into(r, 0)
+        return r
+
+    def serialize_into(self, buf: bytearray, offset: int) -> int:
+        offset = self.header.serialize_into(buf, offset)
+        offset = pxsol.compact_u16.encode_into(len(self.account_keys), buf, offset)
         for e in self.account_keys:
-            r.extend(e.p)
-        r.extend(self.recent_blockhash)
-        r.extend(pxsol.compact_u16.encode(len(self.instructions)))
+            buf[offset:offset + 32] = e.p
+            offset += 32
+        buf[offset:offset + len(self.recent_blockhash)] = self.recent_blockhash
+        offset = pxsol.compact_u16.encode_into(len(self.instructions), buf, offset + len(self.recent_blockhash))
         for e in self.instructions:
-            r.extend(e.serialize())
-        return r
+            offset = e.serialize_into(buf, offset)
+        return offset
+
+    def serialize_size(self) -> int:
+        return sum([
+            self.header.serialize_size(),
+            pxsol.compact_u16.encode_size(len(self.account_keys)),
+            32 * len(self.account_keys),
+            len(self.recent_blockhash),
+            pxsol.compact_u16.encode_size(len(self.instructions)),
+            sum([e.serialize_size() for e in self.instructions]),
+        ])
 
     @classmethod
     def serialize_decode(cls, data: bytearray) -> Message:
@@ -369,7 +584,8 @@ class Message:
     def serialize_decode_reader(cls, reader: io.BytesIO) -> Message:
         m = Message(MessageHeader.serialize_decode_reader(reader), [], bytearray(), [])
         for _ in range(pxsol.compact_u16.decode_reader(reader)):
-            m.account_keys.append(PubKey(pxsol.io.read_full(reader, 32)))
+            k = bytes(pxsol.io.read_full(reader, 32))
+            m.account_keys.append(pubkey_intern.get(k) or PubKey(k))
         m.recent_blockhash = pxsol.io.read_full(reader, 32)
         for _ in range(pxsol.compact_u16.decode_reader(reader)):
             m.instructions.append(Instruction.serialize_decode_reader(reader))
@@ -407,13 +623,39 @@ class MessageV0:
         return r
 
     def serialize(self) -> bytearray:
-        r = bytearray([0x80])
-        r.extend(self.downgrade().serialize())
-        r.extend(pxsol.compact_u16.encode(len(self.address_table_lookups)))
-        for e in self.address_table_lookups:
-            r.extend(e.serialize())
+        r = bytearray(self.serialize_size())
+        self.serialize_into(r, 0)
         return r
 
+    def serialize_into(self, buf: bytearray, offset: int) -> int:
+        buf[offset] = 0x80
+        offset = self.header.serialize_into(buf, offset + 1)
+        offset = pxsol.compact_u16.encode_into(len(self.account_keys), buf, offset)
+        for e in self.account_keys:
+            buf[offset:offset + 32] = e.p
+            offset += 32
+        buf[offset:offset + len(self.recent_blockhash)] = self.recent_blockhash
+        offset = pxsol.compact_u16.encode_into(len(self.instructions), buf, offset + len(self.recent_blockhash))
+        for e in self.instructions:
+            offset = e.serialize_into(buf, offset)
+        offset = pxsol.compact_u16.encode_into(len(self.address_table_lookups), buf, offset)
+        for e in self.address_table_lookups:
+            offset = e.serialize_into(buf, offset)
+        return offset
+
+    def serialize_size(self) -> int:
+        return sum([
+            1,
+            self.header.serialize_size(),
+            pxsol.compact_u16.encode_size(len(self.account_keys)),
+            32 * len(self.account_keys),
+            len(self.recent_blockhash),
+            pxsol.compact_u16.encode_size(len(self.instructions)),
+            sum([e.serialize_size() for e in self.instructions]),
+            pxsol.compact_u16.encode_size(len(self.address_table_lookups)),
+            sum([e.serialize_size() for e in self.address_table_lookups]),
+        ])
+
     @classmethod
     def serialize_decode(cls, data: bytearray) -> MessageV0:
         return MessageV0.serialize_decode_reader(io.BytesIO(data))
@@ -489,13 +731,21 @@ class Transaction:
         return tx
 
     def serialize(self) -> bytearray:
-        r = bytearray()
-        r.extend(pxsol.compact_u16.encode(len(self.signatures)))
-        for e in self.signatures:
-            r.extend(e)
-        r.extend(self.message.serialize())
+        r = bytearray(self.serialize_size())
+        self.serialize_into(r, 0)
         return r
 
+    def serialize_into(self, buf: bytearray, offset: int) -> int:
+        offset = pxsol.compact_u16.encode_into(len(self.signatures), buf, offset)
+        for e in self.signatures:
+            buf[offset:offset + len(e)] = e
+            offset += len(e)
+        return self.message.serialize_into(buf, offset)
+
+    def serialize_size(self) -> int:
+        n = len(self.signatures)
+        return pxsol.compact_u16.encode_size(n) + sum([len(e) for e in self.signatures]) + self.message.serialize_size()
+
     @classmethod
     def serialize_decode(cls, data: bytearray) -> Transaction:
         return Transaction.serialize_decode_reader(io.BytesIO(data))
@@ -535,14 +785,77 @@ class TransactionV0:
             'message': self.message.json()
         }
 
+    @classmethod
+    def requisition_decode(
+        cls,
+        pubkey: PubKey,
+        data: typing.List[Requisition],
+        lookup_tables: typing.Dict[PubKey, typing.List[PubKey]],
+    ) -> TransactionV0:
+        # Convert the requisitions to transaction, loading accounts from the given address lookup tables. Each table
+        # maps its own address to the addresses it holds. Signers and program ids are always static account keys, every
+        # other account held by a table is loaded from the first table holding it. The accounts are ordered as the
+        # runtime loads them: the static account keys, then the writable accounts of all the tables, then the readonly
+        # accounts of all the tables. The given pubkey is the fee payer.
+        m = Transaction.requisition_decode(pubkey, data).message
+        m0 = m.header.readonly
+        m1 = len(m.account_keys) - m.header.required_signatures - m0
+        mode = [3] * m.header.required_signatures + [1] * m1 + [0] * m0
+        table: typing.Dict[PubKey, typing.Tuple[PubKey, int]] = {}
+        for k, v in lookup_tables.items():
+            for i, e in enumerate(v):
+                table.setdefault(e, (k, i))
+        program = set([r.program for r in data])
+        lookup = {k: AddressTableLookup(k, [], []) for k in lookup_tables}
+        static: typing.List[PubKey] = []
+        writable: typing.List[PubKey] = []
+        readonly: typing.List[PubKey] = []
+        static_readonly = 0
+        for k, n in zip(m.account_keys, mode):
+            if n >= 2 or k in program or k not in table:
+                static.append(k)
+                static_readonly += n == 0
+                continue
+            t, i = table[k]
+            assert i < 256
+            if n == 1:
+                lookup[t].writable_indexes.append(i)
+                writable.append(k)
+            else:
+                lookup[t].readonly_indexes.append(i)
+                readonly.append(k)
+        # The table order decides the order of the loaded accounts, so sort them by table as well.
+        order = {k: i for i, k in enumerate(lookup_tables)}
+        writable.sort(key=lambda x: order[table[x][0]])
+        readonly.sort(key=lambda x: order[table[x][0]])
+        index = {k: i for i, k in enumerate(static + writable + readonly)}
+        tx = TransactionV0([], MessageV0(MessageHeader(0, 0, 0), static, bytearray(), [], []))
+        tx.message.header.required_signatures = m.header.required_signatures
+        tx.message.header.readonly_signatures = m.header.readonly_signatures
+        tx.message.header.readonly = static_readonly
+        for e in lookup.values():
+            if e.writable_indexes or e.readonly_indexes:
+                tx.message.address_table_lookups.append(e)
+        for r in data:
+            tx.message.instructions.append(Instruction(index[r.program], [index[a.pubkey] for a in r.account], r.data))
+        return tx
+
     def serialize(self) -> bytearray:
-        r = bytearray()
-        r.extend(pxsol.compact_u16.encode(len(self.signatures)))
-        for e in self.signatures:
-            r.extend(e)
-        r.extend(self.message.serialize())
+        r = bytearray(self.serialize_size())
+        self.serialize_into(r, 0)
         return r
 
+    def serialize_into(self, buf: bytearray, offset: int) -> int:
+        offset = pxsol.compact_u16.encode_into(len(self.signatures), buf, offset)
+        for e in self.signatures:
+            buf[offset:offset + len(e)] = e
+            offset += len(e)
+        return self.message.serialize_into(buf, offset)
+
+    def serialize_size(self) -> int:
+        n = len(self.signatures)
+        return pxsol.compact_u16.encode_size(n) + sum([len(e) for e in self.signatures]) + self.message.serialize_size()
+
     @classmethod
     def serialize_decode(cls, data: bytearray) -> TransactionV0:
         return TransactionV0.serialize_decode_reader(io.BytesIO(data))
@@ -565,6 +878,171 @@ class TransactionV0:
             self.signatures.append(k.sign(m))
 
 
+class RequisitionPack:
+    # The state of a group of requisitions being packed into a single transaction. It tracks the mode of each account,
+    # where each account is loaded from and the size of the compiled transaction. Without lookup tables the transaction
+    # is compiled by Transaction.requisition_decode, otherwise by TransactionV0.requisition_decode.
+
+    def __init__(
+        self,
+        pubkey: PubKey,
+        size: int,
+        lock: int,
+        lookup_tables: typing.Optional[typing.Dict[PubKey, typing.List[PubKey]]],
+    ) -> None:
+        self.account: typing.Dict[PubKey, int] = {pubkey: 3}
+        self.program: typing.Set[PubKey] = set()
+        self.signer = 1
+        self.static = 1
+        # The number of writable and readonly accounts loaded from each table.
+        self.lookup: typing.Dict[PubKey, typing.List[int]] = {}
+        self.instruction = 0
+        self.instruction_size = 0
+        self.size = size
+        self.lock = lock
+        self.v0 = lookup_tables is not None
+        self.table: typing.Dict[PubKey, PubKey] = {}
+        for k, v in (lookup_tables or {}).items():
+            for e in v:
+                self.table.setdefault(e, k)
+
+    def estimate(
+        self,
+        signer: int,
+        static: int,
+        lookup: typing.Dict[PubKey, typing.List[int]],
+        instruction: int,
+        instruction_size: int,
+    ) -> int:
+        # The size of the serialized transaction with the given counts.
+        r = sum([
+            pxsol.compact_u16.encode_size(signer),
+            64 * signer,
+            3,
+            pxsol.compact_u16.encode_size(static),
+            32 * static,
+            32,
+            pxsol.compact_u16.encode_size(instruction),
+            instruction_size,
+        ])
+        if self.v0:
+            used = [e for e in lookup.values() if e[0] + e[1]]
+            r += 1 + pxsol.compact_u16.encode_size(len(used))
+            for w, o in used:
+                r += 32 + pxsol.compact_u16.encode_size(w) + w + pxsol.compact_u16.encode_size(o) + o
+        return r
+
+    def load(self, pubkey: PubKey, mode: int, program: bool) -> typing.Optional[PubKey]:
+        # Get the table the account is loaded from, or none for a static account key.
+        if mode >= 2 or program:
+            return None
+        return self.table.get(pubkey)
+
+    def push(self, data: Requisition) -> bool:
+        # Add the requisition to the group if the transaction still fits, returns whether it has been added.
+        update: typing.Dict[PubKey, int] = {}
+        for a in [AccountMeta(data.program, 0), *data.account]:
+            update[a.pubkey] = update.get(a.pubkey, self.account.get(a.pubkey, 0)) | a.mode
+        signer = self.signer
+        static = self.static
+        lookup = {k: v.copy() for k, v in self.lookup.items()}
+        for k, m in update.items():
+            if k in self.account:
+                n = self.account[k]
+                signer -= n >= 2
+                t = self.load(k, n, k in self.program)
+                if t is None:
+                    static -= 1
+                else:
+                    lookup[t][1 - (n & 1)] -= 1
+            signer += m >= 2
+            t = self.load(k, m, k in self.program or k == data.program)
+            if t is None:
+                static += 1
+            else:
+                lookup.setdefault(t, [0, 0])[1 - (m & 1)] += 1
+        instruction_size = self.instruction_size + sum([
+            1,
+            pxsol.compact_u16.encode_size(len(data.account)),
+            len(data.account),
+            pxsol.compact_u16.encode_size(len(data.data)),
+            len(data.data),
+        ])
+        if len(self.account) + len([k for k in update if k not in self.account]) > self.lock:
+            return False
+        if self.estimate(signer, static, lookup, self.instruction + 1, instruction_size) > self.size:
+            return False
+        self.account.update(update)
+        self.program.add(data.program)
+        self.signer = signer
+        self.static = static
+        self.lookup = lookup
+        self.instruction += 1
+        self.instruction_size = instruction_size
+        return True
+
+
+def requisition_pack(
+    pubkey: PubKey,
+    data: typing.List[Requisition],
+    size: int = 1232,
+    lock: int = 64,
+    lookup_tables: typing.Optional[typing.Dict[PubKey, typing.List[PubKey]]] = None,
+) -> typing.List[typing.List[Requisition]]:
+    # Split the requisitions into groups, in order, so that each group compiles to a transaction which fits the packet
+    # size and locks no more than the given number of accounts. The given pubkey is the fee payer. Every signer is
+    # counted with its signature, so the signer set of each group is accounted for as well. When lookup tables are
+    # given, the groups are sized for v0 transactions loading accounts from them. The size of the candidate
+    # transaction is updated incrementally as requisitions are added, nothing is serialized. Since the order of the
+    # requisitions is kept, filling each group as much as possible gives the fewest groups.
+    r: typing.List[typing.List[Requisition]] = []
+    pack = RequisitionPack(pubkey, size, lock, lookup_tables)
+    for e in data:
+        if r and pack.push(e):
+            r[-1].append(e)
+            continue
+        pack = RequisitionPack(pubkey, size, lock, lookup_tables)
+        # A single requisition which does not fit on its own can never be sent.
+        assert pack.push(e)
+        r.append([e])
+    return r
+
+
+def sign_many(
+    tx: typing.List[typing.Union[Transaction, TransactionV0]],
+    prikey: typing.List[PriKey],
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> None:
+    # Sign many transactions in parallel. Each transaction is signed by the keys its message requires, picked from the
+    # given private keys, and the signatures are appended to it in place, just like Transaction.sign. Messages are
+    # serialized once in the calling process, and the workers receive the expanded private keys so they never hash a
+    # private key again. A process pool with one worker per core is used by default, a
+    # concurrent.futures.InterpreterPoolExecutor works as well.
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            return sign_many(tx, prikey, executor)
+    signer = {e.pubkey(): i for i, e in enumerate(prikey)}
+    expand = [e.expand() for e in prikey]
+    task = []
+    for e in tx:
+        assert len(e.signatures) == 0
+        demand = e.message.account_keys[:e.message.header.required_signatures]
+        task.append(([signer[k] for k in demand], e.message.serialize()))
+    todo = [executor.submit(sign_expand_many, expand, chunk) for chunk in itertools.batched(task, 64)]
+    for chunk, f in zip(itertools.batched(tx, 64), todo):
+        for e, sigs in zip(chunk, f.result()):
+            e.signatures.extend(sigs)
+
+
+def sign_expand_many(
+    prikey: typing.List[typing.Tuple[pxsol.ed25519.Fr, bytearray, bytearray]],
+    task: typing.List[typing.Tuple[typing.List[int], bytearray]],
+) -> typing.List[typing.List[bytearray]]:
+    # Sign a chunk of messages, each with the expanded private keys at the given indexes. This is the unit of work sent
+    # to the workers of sign_many.
+    return [[pxsol.eddsa.sign_expand(*prikey[i], m) for i in k] for k, m in task]
+
+
 class TransactionClassify:
     # Classify the transaction version type.
 
@@ -576,6 +1054,145 @@ class TransactionClassify:
         return data[1 + data[0] * 64]
 
 
+class TransactionTemplate:
+    # A legacy transaction compiled once from requisitions, for sending the same instructions again and again. The
+    # header, the account keys and the instruction layout are frozen in a serialized message. Each build copies it,
+    # patches the recent blockhash and the instruction data at known offsets and signs it, so a build costs one hash and
+    # one signature per signer.
+
+    def __init__(self, prikey: typing.List[PriKey], data: typing.List[Requisition]) -> None:
+        # The first private key pays the fees.
+        m = Transaction.requisition_decode(prikey[0].pubkey(), data).message
+        m.recent_blockhash = bytearray(32)
+        assert m.header.required_signatures == len(prikey)
+        signer = {e.pubkey(): e for e in prikey}
+        self.prikey = [signer[e] for e in m.account_keys[:m.header.required_signatures]]
+        self.message = m.serialize()
+        self.recent_blockhash_offset = 3 + pxsol.compact_u16.encode_size(len(m.account_keys)) + 32 * len(m.account_keys)
+        # The offset and the size of the data of each instruction.
+        self.data_offset: typing.List[typing.Tuple[int, int]] = []
+        offset = self.recent_blockhash_offset + 32 + pxsol.compact_u16.encode_size(len(m.instructions))
+        for e in m.instructions:
+            offset += e.serialize_size() - len(e.data)
+            self.data_offset.append((offset, len(e.data)))
+            offset += len(e.data)
+
+    def build(self, recent_blockhash: bytearray, data: typing.List[bytearray]) -> bytearray:
+        # Build and sign a transaction with a new recent blockhash and new instruction data, one for each requisition
+        # the template was compiled from. Returns the serialized transaction.
+        assert len(recent_blockhash) == 32
+        assert len(data) == len(self.data_offset)
+        m = bytearray(self.message)
+        m[self.recent_blockhash_offset:self.recent_blockhash_offset + 32] = recent_blockhash
+        # Patch from the last instruction backwards. When the size of some data changes, only the bytes behind it move,
+        # and they have been patched already.
+        for (offset, size), e in zip(reversed(self.data_offset), reversed(data)):
+            if len(e) == size:
+                m[offset:offset + size] = e
+                continue
+            m[offset - pxsol.compact_u16.encode_size(size):offset + size] = pxsol.compact_u16.encode(len(e)) + e
+        r = pxsol.compact_u16.encode(len(self.prikey))
+        for e in self.prikey:
+            r.extend(e.sign(m))
+        r.extend(m)
+        return r
+
+
+class TransactionView:
+    # A lazy view of a serialized transaction, legacy or v0. The offsets of all sections are recorded in a single pass
+    # over the data. Fields are sliced out of the data only when they are accessed, and returned as memoryviews.
+
+    def __init__(self, data: memoryview) -> None:
+        data = memoryview(data)
+        self.data = data
+        n, offset = pxsol.compact_u16.decode_buffer(data, 0)
+        self.signature_offset = offset
+        self.signature_count = n
+        offset += 64 * n
+        self.message_offset = offset
+        # The top bit of the first message byte is set for versioned messages, and only v0 exists.
+        self.v0 = pxsol.io.read_buffer(data, offset, 1)[0] & 0x80 != 0
+        if self.v0:
+            assert data[offset] == 0x80
+            offset += 1
+        self.header_offset = offset
+        n, offset = pxsol.compact_u16.decode_buffer(data, offset + 3)
+        self.account_key_offset = offset
+        self.account_key_count = n
+        offset += 32 * n
+        self.recent_blockhash_offset = offset
+        n, offset = pxsol.compact_u16.decode_buffer(data, offset + 32)
+        # For each instruction: the offset of its program index, the offset and the number of its account indexes, the
+        # offset and the size of its data.
+        self.instruction_offset: typing.List[typing.Tuple[int, int, int, int, int]] = []
+        for _ in range(n):
+            program = offset
+            a, offset = pxsol.compact_u16.decode_buffer(data, offset + 1)
+            account = offset
+            d, offset = pxsol.compact_u16.decode_buffer(data, offset + a)
+            self.instruction_offset.append((program, account, a, offset, d))
+            offset += d
+        self.address_table_lookup_offset = offset
+        if self.v0:
+            n, offset = pxsol.compact_u16.decode_buffer(data, offset)
+            for _ in range(n):
+                w, offset = pxsol.compact_u16.decode_buffer(data, offset + 32)
+                r, offset = pxsol.compact_u16.decode_buffer(data, offset + w)
+                offset += r
+        if offset > len(data):
+            raise EOFError('io: EOF')
+        self.size = offset
+
+    def account_key(self, i: int) -> memoryview:
+        # Get the i-th static account key. Keys loaded from address lookup tables are not part of the data.
+        assert i >= 0 and i < self.account_key_count
+        offset = self.account_key_offset + 32 * i
+        return self.data[offset:offset + 32]
+
+    def decode(self) -> typing.Union[Transaction, TransactionV0]:
+        # Decode the whole transaction.
+        data = bytearray(self.data[:self.size])
+        return TransactionV0.serialize_decode(data) if self.v0 else Transaction.serialize_decode(data)
+
+    def header(self) -> MessageHeader:
+        return MessageHeader.serialize_decode(bytearray(self.data[self.header_offset:self.header_offset + 3]))
+
+    def instruction(self, i: int) -> Instruction:
+        # Decode the i-th instruction.
+        program = self.instruction_program(i)
+        return Instruction(program, list(self.instruction_account(i)), bytearray(self.instruction_data(i)))
+
+    def instruction_account(self, i: int) -> memoryview:
+        # Get the account indexes of the i-th instruction.
+        _, offset, size, _, _ = self.instruction_offset[i]
+        return self.data[offset:offset + size]
+
+    def instruction_count(self) -> int:
+        return len(self.instruction_offset)
+
+    def instruction_data(self, i: int) -> memoryview:
+        # Get the data of the i-th instruction.
+        _, _, _, offset, size = self.instruction_offset[i]
+        return self.data[offset:offset + size]
+
+    def instruction_program(self, i: int) -> int:
+        # Get the account index of the program of the i-th instruction.
+        return self.data[self.instruction_offset[i][0]]
+
+    def message(self) -> memoryview:
+        # Get the serialized message, which is what the signatures sign.
+        return self.data[self.message_offset:self.size]
+
+    def recent_blockhash(self) -> memoryview:
+        return self.data[self.recent_blockhash_offset:self.recent_blockhash_offset + 32]
+
+    def signature(self, i: int) -> memoryview:
+        # Get the i-th signature. The first signature is the transaction id.
+        assert i >= 0 and i < self.signature_count
+        offset = self.signature_offset + 64 * i
+        return self.data[offset:offset + 64]
+
+
 class TokenExtensionMetadataPointer:
     # Metadata pointer extension data for mints.
 
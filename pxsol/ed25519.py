@@ -1,3 +1,4 @@
+import functools
 import json
 import typing
 
@@ -81,6 +82,9 @@ class Fr(Fp):
 
 A = -Fq(1)
 D = -Fq(121665) / Fq(121666)
+D2 = (D + D).n
+# Square root of -1.
+SQRTM1 = pow(2, (P - 1) // 4, P)
 
 
 class Pt:
@@ -106,25 +110,16 @@ class Pt:
         #           x1 * y2 + x2 * y1                y1 * y2 - a * x1 * x2
         # x3 = --------------------------,   y3 = ---------------------------
         #       1 + d * x1 * x2 * y1 * y2          1 - d * x1 * x2 * y1 * y2
-        x1, x2 = self.x, data.x
-        y1, y2 = self.y, data.y
-        x3 = (x1 * y2 + x2 * y1) / (Fq(1) + D * x1 * x2 * y1 * y2)
-        y3 = (y1 * y2 - A * x1 * x2) / (Fq(1) - D * x1 * x2 * y1 * y2)
-        return self.__class__(x3, y3)
+        # The two divisions are expensive, so the sum is computed in extended coordinates and converted back with a
+        # single inversion.
+        return (self.ext() + data.ext()).pt()
 
     def __mul__(self, k: Fr) -> Pt:
-        # Point multiplication: Double-and-add
-        # https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication
-        n = k.n
-        result = I
-        addend = self
-        while n:
-            b = n & 1
-            if b == 1:
-                result += addend
-            addend = addend + addend
-            n = n >> 1
-        return result
+        # Point multiplication is done entirely in extended coordinates, only the result is converted back to affine.
+        # Multiples of the generator are looked up in a precomputed table instead.
+        if self.x.n == G.x.n and self.y.n == G.y.n:
+            return mul_base(k).pt()
+        return (self.ext() * k).pt()
 
     def __neg__(self) -> Pt:
         return Pt(-self.x, self.y)
@@ -138,6 +133,10 @@ class Pt:
     def __pos__(self) -> Pt:
         return self
 
+    def ext(self) -> Ep:
+        # Convert to extended coordinates.
+        return Ep(self.x.n, self.y.n, 1, self.x.n * self.y.n % P)
+
     def json(self) -> typing.Dict[str, str]:
         return {
             'x': self.x.json(),
@@ -145,6 +144,87 @@ class Pt:
         }
 
 
+class Ep:
+    # Point in extended twisted edwards coordinates (X:Y:Z:T), with x = X/Z, y = Y/Z and x * y = T/Z. Addition and
+    # doubling are inversion-free, so a scalar multiplication needs only one inversion, when converting back to affine.
+    # See https://datatracker.ietf.org/doc/html/rfc8032#section-5.1.4
+    #
+    # This is the hot path of every signature, so coordinates are plain integers modulo P rather than Fq objects: no
+    # object is allocated and no field check is made per operation.
+
+    __slots__ = ['x', 'y', 'z', 't']
+
+    def __init__(self, x: int, y: int, z: int, t: int) -> None:
+        self.x = x
+        self.y = y
+        self.z = z
+        self.t = t
+
+    def __eq__(self, data: object) -> bool:
+        assert isinstance(data, self.__class__)
+        return all([
+            (self.x * data.z - data.x * self.z) % P == 0,
+            (self.y * data.z - data.y * self.z) % P == 0,
+        ])
+
+    def __repr__(self) -> str:
+        return json.dumps(self.json())
+
+    def __add__(self, data: typing.Self) -> typing.Self:
+        # Unified addition formulas for a = -1, also valid for doubling.
+        a = (self.y - self.x) * (data.y - data.x) % P
+        b = (self.y + self.x) * (data.y + data.x) % P
+        c = self.t * D2 * data.t % P
+        d = self.z * 2 * data.z % P
+        e = b - a
+        f = d - c
+        g = d + c
+        h = b + a
+        return Ep(e * f % P, g * h % P, f * g % P, e * h % P)
+
+    def __mul__(self, k: Fr) -> Ep:
+        # Point multiplication: Double-and-add
+        # https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication
+        n = k.n
+        result = Ep(0, 1, 1, 0)
+        addend = self
+        while n:
+            b = n & 1
+            if b == 1:
+                result += addend
+            addend = addend.double()
+            n = n >> 1
+        return result
+
+    def __neg__(self) -> Ep:
+        return Ep(P - self.x, self.y, self.z, P - self.t)
+
+    def __sub__(self, data: Ep) -> Ep:
+        return self + data.__neg__()
+
+    def __pos__(self) -> Ep:
+        return self
+
+    def double(self) -> Ep:
+        # Dedicated doubling formulas for a = -1, cheaper than the unified addition.
+        a = self.x * self.x % P
+        b = self.y * self.y % P
+        c = 2 * self.z * self.z % P
+        h = a + b
+        e = h - (self.x + self.y) * (self.x + self.y) % P
+        g = a - b
+        f = c + g
+        return Ep(e * f % P, g * h % P, f * g % P, e * h % P)
+
+    def json(self) -> typing.Dict[str, str]:
+        return self.pt().json()
+
+    def pt(self) -> Pt:
+        # Convert to affine coordinates.
+        z = pow(self.z, -1, P)
+        return Pt(Fq(self.x * z), Fq(self.y * z))
+
+
 # Identity element
 I = Pt(
     Fq(0),
@@ -156,6 +236,175 @@ G = Pt(
     Fq(0x6666666666666666666666666666666666666666666666666666666666666658),
 )
 
+
+@functools.cache
+def mul_base_table() -> typing.List[typing.List[Ep]]:
+    # Fixed-base precomputation for the generator, built once per process on first use. Entry [i][j] holds
+    # j * 16^i * G, normalized to z = 1. 64 rows of 16 entries cover every 256-bit scalar.
+    r = []
+    b = G.ext()
+    for _ in range(64):
+        row = [Ep(0, 1, 1, 0), b]
+        for _ in range(14):
+            row.append(row[-1] + b)
+        b = row[-1] + b
+        r.append([e.pt().ext() for e in row])
+    return r
+
+
+def mul_base(k: Fr) -> Ep:
+    # Multiply the generator by k. The scalar is cut into 4-bit windows, and each window selects one entry of the
+    # precomputed table, so the whole multiplication costs at most 64 additions and no doubling.
+    n = k.n
+    t = mul_base_table()
+    r = Ep(0, 1, 1, 0)
+    for i in range(64):
+        j = n & 0xf
+        if j:
+            r += t[i][j]
+        n >>= 4
+    return r
+
+
+@functools.cache
+def mul_double_table() -> typing.List[Ep]:
+    # Odd multiples G, 3G, 5G, ..., 127G of the generator, used by the width-8 naf digits of mul_double.
+    r = [G.ext()]
+    g = r[0].double()
+    for _ in range(63):
+        r.append(r[-1] + g)
+    return [e.pt().ext() for e in r]
+
+
+def mul_double(a: Fr, p: Ep, b: Fr) -> Ep:
+    # Double-scalar multiplication, computes a * G + b * p. Both scalars are recoded in width-w naf and share one chain
+    # of doublings (Straus-Shamir trick), which halves the doublings compared to two separate multiplications. The
+    # generator uses w = 8 with a precomputed table, the variable point uses w = 5 with a table built on the fly.
+    u = wnaf(a.n, 8)
+    v = wnaf(b.n, 5)
+    tg = mul_double_table()
+    tp = [p]
+    p2 = p.double()
+    for _ in range(7):
+        tp.append(tp[-1] + p2)
+    r = Ep(0, 1, 1, 0)
+    for i in range(max(len(u), len(v)) - 1, -1, -1):
+        r = r.double()
+        if i < len(u) and u[i] > 0:
+            r += tg[u[i] >> 1]
+        if i < len(u) and u[i] < 0:
+            r -= tg[-u[i] >> 1]
+        if i < len(v) and v[i] > 0:
+            r += tp[v[i] >> 1]
+        if i < len(v) and v[i] < 0:
+            r -= tp[-v[i] >> 1]
+    return r
+
+
+def mul_multi(p: typing.List[Ep], k: typing.List[Fr]) -> Ep:
+    # Multi-scalar multiplication, computes k[0] * p[0] + k[1] * p[1] + ... + k[n-1] * p[n-1]. Straus is faster for
+    # a small number of points, Pippenger wins once the number of points grows large.
+    assert len(p) == len(k)
+    if len(p) < 190:
+        return mul_straus(p, k)
+    return mul_pippenger(p, k)
+
+
+def mul_straus(p: typing.List[Ep], k: typing.List[Fr]) -> Ep:
+    # Straus's method: all the scalars share a single chain of doublings. Each point gets a table of 16 multiples,
+    # and each 4-bit window of each scalar costs one addition.
+    t = []
+    for e in p:
+        row = [Ep(0, 1, 1, 0), e]
+        for _ in range(14):
+            row.append(row[-1] + e)
+        t.append(row)
+    r = Ep(0, 1, 1, 0)
+    for i in range(252, -4, -4):
+        r = r.double().double().double().double()
+        for j in range(len(p)):
+            d = (k[j].n >> i) & 0xf
+            if d:
+                r += t[j][d]
+    return r
+
+
+def mul_pippenger(p: typing.List[Ep], k: typing.List[Fr]) -> Ep:
+    # Pippenger's bucket method. For each c-bit window, points are first accumulated into buckets by their digit,
+    # then the weighted sum of the buckets is computed with a running sum. Its cost grows like n / log(n).
+    c = 6 if len(p) < 500 else 7 if len(p) < 800 else 8
+    m = (1 << c) - 1
+    r = Ep(0, 1, 1, 0)
+    for i in range((255 // c) * c, -c, -c):
+        for _ in range(c):
+            r = r.double()
+        b: typing.List[typing.Optional[Ep]] = [None] * (m + 1)
+        for j in range(len(p)):
+            d = (k[j].n >> i) & m
+            if d:
+                b[d] = p[j] if b[d] is None else b[d] + p[j]
+        u = Ep(0, 1, 1, 0)
+        v = Ep(0, 1, 1, 0)
+        for d in range(m, 0, -1):
+            if b[d] is not None:
+                u += b[d]
+            v += u
+        r += v
+    return r
+
+
+def pt_torsion_free(p: Ep) -> bool:
+    # Tests whether a point lies in the prime order subgroup generated by G. The curve group is the product of that
+    # subgroup and the 8 points of small order, so a point carries no small order component exactly when N * p is the
+    # identity. The scalar is recoded in width-5 naf, as the variable point of mul_double.
+    v = wnaf(N, 5)
+    t = [p]
+    p2 = p.double()
+    for _ in range(7):
+        t.append(t[-1] + p2)
+    r = Ep(0, 1, 1, 0)
+    for i in range(len(v) - 1, -1, -1):
+        r = r.double()
+        if v[i] > 0:
+            r += t[v[i] >> 1]
+        if v[i] < 0:
+            r -= t[-v[i] >> 1]
+    return r == I.ext()
+
+
+def pt_many(p: typing.List[Ep]) -> typing.List[Pt]:
+    # Convert many points to affine coordinates with a single shared inversion (montgomery's trick). The product of all
+    # z is inverted once, and the inverse of each z is then peeled off with two multiplications.
+    c = []
+    m = 1
+    for e in p:
+        c.append(m)
+        m = m * e.z % P
+    m = pow(m, -1, P)
+    r = [I] * len(p)
+    for i in range(len(p) - 1, -1, -1):
+        z = m * c[i] % P
+        m = m * p[i].z % P
+        r[i] = Pt(Fq(p[i].x * z), Fq(p[i].y * z))
+    return r
+
+
+def wnaf(n: int, w: int) -> typing.List[int]:
+    # Width-w non-adjacent form of n, least significant digit first. Every non-zero digit is odd and smaller than
+    # 2^(w-1) in absolute value, and among any w consecutive digits at most one is non-zero.
+    r = []
+    while n:
+        d = 0
+        if n & 1:
+            d = n & ((1 << w) - 1)
+            if d >= 1 << (w - 1):
+                d -= 1 << w
+            n -= d
+        r.append(d)
+        n >>= 1
+    return r
+
+
 if __name__ == '__main__':
     p = G * Fr(42)
     q = G * Fr(24)
@@ -167,3 +416,14 @@ if __name__ == '__main__':
     assert p + r == I
     assert p + I == p
     assert p * Fr(42) == G * Fr(1764)
+    assert p.ext() + q.ext() == (G * Fr(66)).ext()
+    assert p.ext().double() == p.ext() + p.ext()
+    assert (p.ext() - p.ext()).pt() == I
+    assert (G.ext() * Fr(1764)).pt() == p * Fr(42)
+    assert mul_base(Fr(1764)) == G.ext() * Fr(1764)
+    assert mul_base(Fr(N - 1)) == -G.ext()
+    assert sum([e << i for i, e in enumerate(wnaf(N - 1, 5))]) == N - 1
+    assert mul_double(Fr(42), q.ext(), Fr(2)) == (G * Fr(90)).ext()
+    assert pt_many([p.ext().double(), q.ext() + q.ext()]) == [p + p, q + q]
+    assert mul_straus([p.ext(), q.ext()], [Fr(2), Fr(3)]) == (G * Fr(156)).ext()
+    assert mul_pippenger([p.ext(), q.ext()], [Fr(2), Fr(3)]) == (G * Fr(156)).ext()
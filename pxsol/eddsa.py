@@ -1,5 +1,7 @@
 import hashlib
 import pxsol.ed25519
+import secrets
+import typing
 
 # Edwards-Curve Digital Signature Algorithm (EdDSA)
 # See https://datatracker.ietf.org/doc/html/rfc8032#ref-CURVE25519
@@ -30,27 +32,14 @@ def pt_decode(pt: bytearray) -> pxsol.ed25519.Pt:
     bit0 = uint >> 255
     yint = uint & ((1 << 255) - 1)
     assert yint < pxsol.ed25519.P
-    # To recover the x-coordinate, the curve equation implies x^2 = (y^2 - 1) / (d y^2 + 1) (mod p). The denominator is
-    # always non-zero mod p.
-    y = pxsol.ed25519.Fq(yint)
-    u = y * y - pxsol.ed25519.Fq(1)
-    v = pxsol.ed25519.D * y * y + pxsol.ed25519.Fq(1)
-    w = u / v
-    # To compute the square root of (u/v), the first step is to compute the candidate root x = (u/v)^((p+3)/8).
-    x = w ** ((pxsol.ed25519.P + 3) // 8)
-    # Again, there are three cases:
-    # 1. If v x^2 = +u (mod p), x is a square root.
-    # 2. If v x^2 = -u (mod p), set x <-- x * 2^((p-1)/4), which is a square root.
-    # 3. Otherwise, no square root exists for modulo p, and decoding fails.
-    if x*x != w:
-        x = x * pxsol.ed25519.Fq(2) ** ((pxsol.ed25519.P - 1) // 4)
-        assert x*x == w
+    x = pt_x(yint)
+    assert x is not None
     # Finally, use the x_0 bit to select the right square root. If x = 0, and x_0 = 1, decoding fails. Otherwise, if
     # x_0 != x mod 2, set x <-- p - x.  Return the decoded point (x,y).
-    assert x != pxsol.ed25519.Fq(0) or not bit0
-    if x.n & 1 != bit0:
-        x = -x
-    return pxsol.ed25519.Pt(x, y)
+    assert x != 0 or not bit0
+    if x & 1 != bit0:
+        x = pxsol.ed25519.P - x
+    return pxsol.ed25519.Pt(pxsol.ed25519.Fq(x), pxsol.ed25519.Fq(yint))
 
 
 def pt_exists(pt: bytearray) -> bool:
@@ -60,42 +49,73 @@ def pt_exists(pt: bytearray) -> bool:
     yint = uint & ((1 << 255) - 1)
     if yint >= pxsol.ed25519.P:
         return False
-    y = pxsol.ed25519.Fq(yint)
-    u = y * y - pxsol.ed25519.Fq(1)
-    v = pxsol.ed25519.D * y * y + pxsol.ed25519.Fq(1)
-    w = u / v
-    x = w ** ((pxsol.ed25519.P + 3) // 8)
-    if x*x != w:
-        x = x * pxsol.ed25519.Fq(2) ** ((pxsol.ed25519.P - 1) // 4)
-    if x*x != w:
+    x = pt_x(yint)
+    if x is None:
         return False
-    if x == pxsol.ed25519.Fq(0) and bit0:
+    if x == 0 and bit0:
         return False
     return True
 
 
-def pubkey(prikey: bytearray) -> bytearray:
+def pt_x(y: int) -> typing.Optional[int]:
+    # Recover a x-coordinate from the y-coordinate, returns none if the point is not on the curve. The sign of the
+    # returned root is arbitrary. The field arithmetic is done on plain integers.
+    #
+    # To recover the x-coordinate, the curve equation implies x^2 = (y^2 - 1) / (d y^2 + 1) (mod p). The denominator is
+    # always non-zero mod p. Let u = y^2 - 1 and v = d y^2 + 1. To compute the square root of (u/v), the first step is
+    # to compute the candidate root x = (u/v)^((p+3)/8). This can be done with the following trick, to use a single
+    # modular powering for both the inversion and the square root: x = u v^3 (u v^7)^((p-5)/8) (mod p).
+    p = pxsol.ed25519.P
+    u = (y * y - 1) % p
+    v = (pxsol.ed25519.D.n * y * y + 1) % p
+    v3 = v * v * v % p
+    x = u * v3 * pow(u * v3 * v3 * v, (p - 5) // 8, p) % p
+    # Again, there are three cases:
+    # 1. If v x^2 = +u (mod p), x is a square root.
+    # 2. If v x^2 = -u (mod p), set x <-- x * 2^((p-1)/4), which is a square root.
+    # 3. Otherwise, no square root exists for modulo p, and decoding fails.
+    c = v * x * x % p
+    if c == u:
+        return x
+    if c == p - u:
+        return x * pxsol.ed25519.SQRTM1 % p
+    return None
+
+
+def expand(prikey: bytearray) -> typing.Tuple[pxsol.ed25519.Fr, bytearray]:
+    # Hash the 32-octet private key using SHA-512. Construct the secret scalar from the first half of the digest, and
+    # the second half of the digest is the prefix used to generate the nonce.
+    # See https://datatracker.ietf.org/doc/html/rfc8032#section-5.1.5
     assert len(prikey) == 32
     h = hash(prikey)
     a = int.from_bytes(h[:32], 'little')
     a &= (1 << 254) - 8
     a |= (1 << 254)
-    a = pxsol.ed25519.Fr(a)
+    return pxsol.ed25519.Fr(a), h[32:]
+
+
+def pubkey(prikey: bytearray) -> bytearray:
+    a, _ = expand(prikey)
     return pt_encode(pxsol.ed25519.G * a)
 
 
+def pubkey_many(prikey: typing.List[bytearray]) -> typing.List[bytearray]:
+    # Derive many public keys at once. The scalar multiplications stay in extended coordinates, and all the results are
+    # converted to affine with a single shared inversion.
+    ep = [pxsol.ed25519.mul_base(expand(e)[0]) for e in prikey]
+    return [pt_encode(e) for e in pxsol.ed25519.pt_many(ep)]
+
+
 def sign(prikey: bytearray, m: bytearray) -> bytearray:
     # The inputs to the signing procedure is the private key, a 32-octet string, and a message M of arbitrary size.
     # See https://datatracker.ietf.org/doc/html/rfc8032#section-5.1.6
-    assert len(prikey) == 32
-    h = hash(prikey)
-    a = int.from_bytes(h[:32], 'little')
-    a &= (1 << 254) - 8
-    a |= (1 << 254)
-    a = pxsol.ed25519.Fr(a)
-    A = pxsol.ed25519.G * a
-    pubkey = pt_encode(A)
-    prefix = h[32:]
+    a, prefix = expand(prikey)
+    return sign_expand(a, prefix, pt_encode(pxsol.ed25519.G * a), m)
+
+
+def sign_expand(a: pxsol.ed25519.Fr, prefix: bytearray, pubkey: bytearray, m: bytearray) -> bytearray:
+    # Sign with an already expanded private key. Callers signing repeatedly with the same key can keep the secret
+    # scalar, the prefix and the public key around, so each signature costs a single scalar multiplication.
     r = pxsol.ed25519.Fr(int.from_bytes(hash(prefix + m), 'little'))
     R = pxsol.ed25519.G * r
     digest = pt_encode(R)
@@ -114,4 +134,73 @@ def verify(pubkey: bytearray, m: bytearray, v: bytearray) -> bool:
     R = pt_decode(digest)
     s = pxsol.ed25519.Fr(int.from_bytes(v[32:], 'little'))
     h = pxsol.ed25519.Fr(int.from_bytes(hash(digest + pubkey + m), 'little'))
-    return pxsol.ed25519.G * s == R + A * h
+    # The check s * G = R + h * A is rearranged to s * G - h * A = R, so the left side is a single double-scalar
+    # multiplication. Compare in extended coordinates, no inversion is needed.
+    return pxsol.ed25519.mul_double(s, -A.ext(), h) == R.ext()
+
+
+def verify_batch(data: typing.List[typing.Tuple[bytearray, bytearray, bytearray]], strict: bool = False) -> bool:
+    # Verify many (pubkey, message, signature) triples at once. Each equation s * G = R + h * A is multiplied by a
+    # random 128-bit coefficient z, and the equations are summed into a single check
+    #     8 * ((sum z * s) * G - sum z * R - sum (z * h) * A) = 0,
+    # which is evaluated with one multi-scalar multiplication. A forged signature passes with probability 2^-128.
+    # Returns false if any signature is invalid or any point fails to decode.
+    # See https://datatracker.ietf.org/doc/html/rfc8032#section-8.4
+    #
+    # Random coefficients cannot cancel small order components reliably, so the sum is multiplied by the cofactor 8.
+    # The batch equation is therefore cofactored: it accepts a triple when s * G - h * A - R is a point of small order,
+    # while verify requires it to be zero. The two only differ on signatures built from points with a small order
+    # component, which honest signers never produce. Pass strict to make the result agree with verify exactly. The
+    # small order component of s * G - h * A - R is the one of R + (h mod 8) * A, which is then checked with
+    # pt_torsion_free. When the public key itself is torsion free, which is remembered for each distinct key, only R
+    # has to be checked. That is still a scalar multiplication per signature, so strict mode is no faster than calling
+    # verify in a loop.
+    p = []
+    k = []
+    x = []
+    b = pxsol.ed25519.Fr(0)
+    cache: typing.Dict[bytes, typing.Tuple[pxsol.ed25519.Ep, bool]] = {}
+    for pubkey, m, v in data:
+        assert len(pubkey) == 32
+        assert len(v) == 64
+        try:
+            if bytes(pubkey) not in cache:
+                A = pt_decode(pubkey).ext()
+                cache[bytes(pubkey)] = (A, strict and pxsol.ed25519.pt_torsion_free(A))
+            R = pt_decode(v[:32]).ext()
+        except AssertionError:
+            return False
+        A, clean = cache[bytes(pubkey)]
+        s = pxsol.ed25519.Fr(int.from_bytes(v[32:], 'little'))
+        h = pxsol.ed25519.Fr(int.from_bytes(hash(v[:32] + pubkey + m), 'little'))
+        z = pxsol.ed25519.Fr(secrets.randbits(128))
+        b += z * s
+        p.append(R)
+        k.append(-z)
+        p.append(A)
+        k.append(-z * h)
+        if strict:
+            x.append(R if clean else R + A * pxsol.ed25519.Fr(h.n & 7))
+    r = pxsol.ed25519.mul_base(b) + pxsol.ed25519.mul_multi(p, k)
+    r = r.double().double().double()
+    if r != pxsol.ed25519.I.ext():
+        return False
+    for e in x:
+        if not pxsol.ed25519.pt_torsion_free(e):
+            return False
+    return True
+
+
+def verify_batch_invalid(
+    data: typing.List[typing.Tuple[bytearray, bytearray, bytearray]],
+    strict: bool = False,
+) -> typing.List[int]:
+    # Find the indexes of the invalid triples. The whole batch is checked first, and a failing batch is split in
+    # halves until the invalid triples are isolated, so a mostly valid batch costs little more than verify_batch. The
+    # triples are judged as verify_batch judges them, with the same strict flag.
+    if len(data) == 1:
+        return [] if verify_batch(data, strict) else [0]
+    if verify_batch(data, strict):
+        return []
+    m = len(data) // 2
+    return verify_batch_invalid(data[:m], strict) + [m + e for e in verify_batch_invalid(data[m:], strict)]
@@ -1,3 +1,4 @@
+import struct
 import typing
 
 
@@ -10,3 +11,34 @@ def read_full(reader: typing.BinaryIO, n: int) -> bytearray:
             raise EOFError('io: EOF')
         data.extend(once)
     return data
+
+
+def read_buffer(data: memoryview, offset: int, n: int) -> memoryview:
+    # Get exactly n bytes of data starting at offset, without copying them, or raise EOFError.
+    if offset + n > len(data):
+        raise EOFError('io: EOF')
+    return data[offset:offset + n]
+
+
+def unpack_buffer(format: str, data: memoryview, offset: int) -> typing.Tuple[typing.Any, ...]:
+    # Unpack the values of a struct format from data starting at offset, or raise EOFError, as read_buffer does.
+    try:
+        return struct.unpack_from(format, data, offset)
+    except struct.error as e:
+        raise EOFError('io: EOF') from e
+
+
+class BufferReader:
+    # A binary reader over a memoryview starting at offset. Reads return slices of the view, the underlying data is
+    # never copied. The offset advances as data is read.
+
+    def __init__(self, data: memoryview, offset: int) -> None:
+        self.data = data
+        self.offset = offset
+
+    def read(self, n: int = -1) -> memoryview:
+        if n < 0:
+            n = len(self.data) - self.offset
+        r = self.data[self.offset:self.offset + n]
+        self.offset += len(r)
+        return r
@@ -14,7 +14,7 @@ class AddressLookupTable:
     # See: https://solana.com/zh/developers/guides/advanced/lookup-tables
     # See: https://github.com/anza-xyz/solana-sdk/tree/master/address-lookup-table-interface
 
-    pubkey = pxsol.core.PubKey.base58_decode('AddressLookupTab1e1111111111111111111111111')
+    pubkey = pxsol.core.PubKey.base58_decode('AddressLookupTab1e1111111111111111111111111').intern()
 
     @classmethod
     def create_lookup_table(cls, slot: int, bump: int) -> bytearray:
@@ -68,7 +68,7 @@ class AddressLookupTable:
 class AssociatedTokenAccount:
     # See: https://github.com/solana-program/associated-token-account
 
-    pubkey = pxsol.core.PubKey.base58_decode('ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL')
+    pubkey = pxsol.core.PubKey.base58_decode('ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL').intern()
 
     @classmethod
     def create(cls) -> bytearray:
@@ -114,7 +114,7 @@ class AssociatedTokenAccount:
 class ComputeBudget:
     # See: https://github.com/anza-xyz/solana-sdk/tree/master/compute-budget-interface
 
-    pubkey = pxsol.core.PubKey.base58_decode('ComputeBudget111111111111111111111111111111')
+    pubkey = pxsol.core.PubKey.base58_decode('ComputeBudget111111111111111111111111111111').intern()
 
     @classmethod
     def request_heap_frame(cls, size: int) -> bytearray:
@@ -147,7 +147,7 @@ class LoaderV3:
     # loader.
     # See: https://github.com/anza-xyz/solana-sdk/blob/master/loader-v3-interface
 
-    pubkey = pxsol.core.PubKey.base58_decode('BPFLoaderUpgradeab1e11111111111111111111111')
+    pubkey = pxsol.core.PubKey.base58_decode('BPFLoaderUpgradeab1e11111111111111111111111').intern()
 
     # Account data is serialized by bincode. The enum type takes 4 bytes, and the option takes 1 byte.
     # Size of a buffer account's serialized metadata, calculated by the formula 4 + 1 + 32.
@@ -262,7 +262,7 @@ class LoaderV4:
     # The v4 built-in loader program.
     # See: https://github.com/anza-xyz/solana-sdk/tree/master/loader-v4-interface
 
-    pubkey = pxsol.core.PubKey.base58_decode('LoaderV411111111111111111111111111111111111')
+    pubkey = pxsol.core.PubKey.base58_decode('LoaderV411111111111111111111111111111111111').intern()
 
     # Loader v4 account states size.
     size_program_data = 8 + 32 + 8
@@ -334,7 +334,7 @@ class System:
     # See: https://github.com/solana-program/system
     # See: https://github.com/anza-xyz/solana-sdk/blob/master/system-interface
 
-    pubkey = pxsol.core.PubKey(bytearray(32))
+    pubkey = pxsol.core.PubKey(bytearray(32)).intern()
 
     @classmethod
     def create_account(cls, lamports: int, size: int, host: pxsol.core.PubKey) -> bytearray:
@@ -486,22 +486,22 @@ class SysvarClock:
     # The Clock sysvar contains data on cluster time, including the current slot, epoch, and estimated wall-clock unix
     # timestamp. It is updated every slot.
 
-    pubkey = pxsol.core.PubKey.base58_decode('SysvarC1ock11111111111111111111111111111111')
+    pubkey = pxsol.core.PubKey.base58_decode('SysvarC1ock11111111111111111111111111111111').intern()
 
 
 class SysvarRent:
     # The rent sysvar contains the rental rate. Currently, the rate is static and set in genesis. The rent burn
     # percentage is modified by manual feature activation.
 
-    pubkey = pxsol.core.PubKey.base58_decode('SysvarRent111111111111111111111111111111111')
+    pubkey = pxsol.core.PubKey.base58_decode('SysvarRent111111111111111111111111111111111').intern()
 
 
 class Token:
     # Solana spl token.
     # See: https://github.com/solana-program/token-2022
 
-    pubkey_2020 = pxsol.core.PubKey.base58_decode('TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA')
-    pubkey_2022 = pxsol.core.PubKey.base58_decode('TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb')
+    pubkey_2020 = pxsol.core.PubKey.base58_decode('TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA').intern()
+    pubkey_2022 = pxsol.core.PubKey.base58_decode('TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb').intern()
     pubkey = pubkey_2022
     # See: https://github.com/solana-labs/solana-program-library/blob/master/token/program-2022/src/state.rs
     size_mint = 82
@@ -974,9 +974,11 @@ class TokenExtensionMetadata:
         # 0. -w metadata account.
         # 1. sr current update authority.
         discriminator = bytearray(hashlib.sha256(b'spl_token_metadata_interface:update_the_authority').digest()[:8])
+        # The new authority is an optional non-zero pubkey, all zeros stand for none.
         return pxsol.borsh.Struct([
+            pxsol.borsh.Array(pxsol.borsh.U8, 8),
             pxsol.borsh.Array(pxsol.borsh.U8, 32),
-        ]).encode([discriminator, auth.p if auth is not None else None])
+        ]).encode([discriminator, auth.p if auth is not None else bytearray(32)])
 
     @classmethod
     def emit(cls, start: typing.Optional[int], end: typing.Optional[int]) -> bytearray:
@@ -984,7 +986,7 @@ class TokenExtensionMetadata:
         # 0. -r metadata account.
         discriminator = bytearray(hashlib.sha256(b'spl_token_metadata_interface:emitter').digest()[:8])
         return pxsol.borsh.Struct([
-            pxsol.borsh.Array(pxsol.borsh.U8, 32),
+            pxsol.borsh.Array(pxsol.borsh.U8, 8),
             pxsol.borsh.Option(pxsol.borsh.U64),
             pxsol.borsh.Option(pxsol.borsh.U64),
         ]).encode([discriminator, start, end])
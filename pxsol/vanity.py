@@ -0,0 +1,77 @@
+import concurrent.futures
+import os
+import pxsol.base58
+import pxsol.core
+import pxsol.eddsa
+import pxsol.log
+import secrets
+import time
+import typing
+
+# Vanity address search. Random private keys are tried until the base58 address starts with the prefix and ends with
+# the suffix. Every extra character makes the search about 58 times longer.
+#
+# Each candidate is a fresh random private key, since a solana private key is a seed that is hashed before it becomes a
+# scalar: consecutive scalars k, k+1, ... do not correspond to any private key. The cost per candidate is kept low by
+# multiplying with the precomputed generator table and by converting a whole batch of public keys to affine coordinates
+# with a single inversion. The work is spread over all cores.
+
+
+def match(addr: str, prefix: str, suffix: str, icase: bool) -> bool:
+    # Tests whether the address matches the pattern.
+    if icase:
+        addr = addr.lower()
+    return addr.startswith(prefix) and addr.endswith(suffix)
+
+
+def search(
+    prefix: str,
+    suffix: str,
+    icase: bool = False,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> pxsol.core.PriKey:
+    # Search a private key whose address matches the pattern, with the letter case ignored if icase is set. A process
+    # pool with one worker per core is used by default. Its workers import the main module under the forkserver and
+    # spawn start methods, forkserver being the default on linux since python 3.14, so a calling script must guard its
+    # entry point with if __name__ == '__main__'. The number of candidates tried per second is reported in the debug
+    # log.
+    for c in prefix + suffix:
+        assert c in pxsol.base58.B58_DIGITS or icase and (c.lower() in pxsol.base58.B58_DIGITS.lower())
+    if icase:
+        prefix = prefix.lower()
+        suffix = suffix.lower()
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            return search(prefix, suffix, icase, executor)
+    size = 1024
+    todo = set()
+    for _ in range(2 * (os.cpu_count() or 1)):
+        todo.add(executor.submit(search_chunk, prefix, suffix, icase, size))
+    done_size = 0
+    time_init = time.time()
+    time_logs = time_init
+    while True:
+        done, todo = concurrent.futures.wait(todo, return_when=concurrent.futures.FIRST_COMPLETED)
+        for f in done:
+            done_size += size
+            seed = f.result()
+            if seed is not None:
+                for e in todo:
+                    e.cancel()
+                pxsol.log.debugln(f'pxsol: vanity done={done_size} rate={done_size / (time.time() - time_init):.0f}/s')
+                return pxsol.core.PriKey(bytearray(seed))
+            todo.add(executor.submit(search_chunk, prefix, suffix, icase, size))
+        if time.time() - time_logs >= 8:
+            time_logs = time.time()
+            pxsol.log.debugln(f'pxsol: vanity done={done_size} rate={done_size / (time_logs - time_init):.0f}/s')
+
+
+def search_chunk(prefix: str, suffix: str, icase: bool, size: int) -> typing.Optional[bytes]:
+    # Try size random private keys, returns the first one that matches. This is the unit of work sent to the workers.
+    seed = [secrets.token_bytes(32) for _ in range(size)]
+    for i in range(0, size, 256):
+        part = seed[i:i+256]
+        for e, pubkey in zip(part, pxsol.eddsa.pubkey_many([bytearray(e) for e in part])):
+            if match(pxsol.base58.encode(pubkey), prefix, suffix, icase):
+                return e
+    return None
@@ -1,4 +1,5 @@
 import base64
+import concurrent.futures
 import json
 import pxsol.base58
 import pxsol.core
@@ -19,14 +20,52 @@ class WalletHelper:
         # will wait until the transaction is confirmed. Returns the first signature of the transaction, also known as
         # the transaction id.
         tx = pxsol.core.Transaction.requisition_decode(prikey[0].pubkey(), rqlist)
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign(prikey)
-        assert len(tx.serialize()) <= 1232
-        txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
-        assert pxsol.base58.decode(txid) == tx.signatures[0]
+        data = tx.serialize()
+        assert len(data) <= 1232
+        txid = pxsol.rpc.send_transaction(base64.b64encode(data).decode(), {})
+        assert pxsol.base58.decode64(txid) == tx.signatures[0]
         pxsol.rpc.wait([txid])
         return tx.signatures[0]
 
+    @classmethod
+    def requisition_send_pack(
+        cls,
+        prikey: typing.List[pxsol.core.PriKey],
+        rqlist: typing.List[pxsol.core.Requisition],
+        lookup_tables: typing.Optional[typing.Dict[pxsol.core.PubKey, typing.List[pxsol.core.PubKey]]] = None,
+        executor: typing.Optional[concurrent.futures.Executor] = None,
+    ) -> typing.List[bytearray]:
+        # Sends a long list of requisitions, packed in order into as few transactions as possible. The first private
+        # key pays the fees, and each transaction is signed by the keys it requires. When address lookup tables are
+        # given, v0 transactions loading accounts from them are sent. The transactions are signed in the calling
+        # thread, the expanded private keys being cached, unless an executor is given to pxsol.core.sign_many. This
+        # function will wait until all the transactions are confirmed. Returns the transaction ids.
+        recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        txs: typing.List[typing.Union[pxsol.core.Transaction, pxsol.core.TransactionV0]] = []
+        for e in pxsol.core.requisition_pack(prikey[0].pubkey(), rqlist, lookup_tables=lookup_tables):
+            if lookup_tables is None:
+                tx = pxsol.core.Transaction.requisition_decode(prikey[0].pubkey(), e)
+            else:
+                tx = pxsol.core.TransactionV0.requisition_decode(prikey[0].pubkey(), e, lookup_tables)
+            tx.message.recent_blockhash = recent_blockhash
+            txs.append(tx)
+        if executor is None:
+            signer = {e.pubkey(): e for e in prikey}
+            for tx in txs:
+                tx.sign([signer[e] for e in tx.message.account_keys[:tx.message.header.required_signatures]])
+        else:
+            pxsol.core.sign_many(txs, prikey, executor)
+        txid = []
+        for tx in txs:
+            data = tx.serialize()
+            assert len(data) <= 1232
+            txid.append(pxsol.rpc.send_transaction(base64.b64encode(data).decode(), {}))
+            assert pxsol.base58.decode64(txid[-1]) == tx.signatures[0]
+        pxsol.rpc.wait(txid)
+        return [tx.signatures[0] for tx in txs]
+
 
 class WalletLoaderV3:
     # A built-in solana wallet that can be used to perform program loader v3 operations.
@@ -59,7 +98,7 @@ class WalletLoaderV3:
         r1.account.append(pxsol.core.AccountMeta(self.pubkey, 0))
         r1.data = pxsol.program.LoaderV3.initialize_buffer()
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [r0, r1])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey, tempory_prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -74,7 +113,7 @@ class WalletLoaderV3:
             rq.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
             rq.data = pxsol.program.LoaderV3.write(i, elem)
             tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [rq])
-            tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+            tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
             tx.sign([self.prikey])
             txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
             hall.append(txid)
@@ -91,7 +130,7 @@ class WalletLoaderV3:
         rq.account.append(pxsol.core.AccountMeta(program, 1))
         rq.data = pxsol.program.LoaderV3.close()
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [rq])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -124,7 +163,7 @@ class WalletLoaderV3:
         r1.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
         r1.data = pxsol.program.LoaderV3.deploy_with_max_data_len(len(bincode))
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [r0, r1])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey, tempory_prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -149,7 +188,7 @@ class WalletLoaderV3:
             rq.account.append(pxsol.core.AccountMeta(self.pubkey, 3))
             rq.data = pxsol.program.LoaderV3.extend_program_checked(addi)
             tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [rq])
-            tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+            tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
             tx.sign([self.prikey])
             txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
             pxsol.rpc.wait([txid])
@@ -163,7 +202,7 @@ class WalletLoaderV3:
         rq.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
         rq.data = pxsol.program.LoaderV3.upgrade()
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [rq])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -188,7 +227,7 @@ class WalletLoaderV4:
         r1.account.append(pxsol.core.AccountMeta(self.pubkey, 1))
         r1.data = pxsol.program.LoaderV4.set_program_length(0)
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [r0, r1])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -215,7 +254,7 @@ class WalletLoaderV4:
         r1.account.append(pxsol.core.AccountMeta(self.pubkey, 1))
         r1.data = pxsol.program.LoaderV4.set_program_length(len(bincode))
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [r0, r1])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey, tempory_prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -230,7 +269,7 @@ class WalletLoaderV4:
             rq.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
             rq.data = pxsol.program.LoaderV4.write(i, elem)
             tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [rq])
-            tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+            tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
             tx.sign([self.prikey])
             txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
             hall.append(txid)
@@ -241,7 +280,7 @@ class WalletLoaderV4:
         rq.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
         rq.data = pxsol.program.LoaderV4.deploy()
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [rq])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -273,7 +312,7 @@ class WalletLoaderV4:
         rq.data = pxsol.program.LoaderV4.set_program_length(len(bincode))
         rs.append(rq)
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, rs)
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -288,7 +327,7 @@ class WalletLoaderV4:
             rq.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
             rq.data = pxsol.program.LoaderV4.write(i, elem)
             tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [rq])
-            tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+            tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
             tx.sign([self.prikey])
             txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
             hall.append(txid)
@@ -299,7 +338,7 @@ class WalletLoaderV4:
         rq.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
         rq.data = pxsol.program.LoaderV4.deploy()
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [rq])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -357,7 +396,7 @@ class Wallet:
         rq.account.append(pxsol.core.AccountMeta(recv, 1))
         rq.data = pxsol.program.System.transfer(amount)
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [rq])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -418,7 +457,7 @@ class Wallet:
         rq.data = pxsol.program.Token.initialize_mint(decimals, self.pubkey, self.pubkey)
         rs.append(rq)
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, rs)
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey, mint_prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -439,7 +478,7 @@ class Wallet:
             r1.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
             r1.data = pxsol.program.TokenExtensionMetadata.initialize(name, symbol, uri)
             tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [r0, r1])
-            tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+            tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
             tx.sign([self.prikey])
             txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
             pxsol.rpc.wait([txid])
@@ -471,7 +510,7 @@ class Wallet:
         r1.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
         r1.data = pxsol.program.Token.mint_to(amount)
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [r0, r1])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -496,7 +535,7 @@ class Wallet:
         r1.account.append(pxsol.core.AccountMeta(self.pubkey, 2))
         r1.data = pxsol.program.Token.transfer(amount)
         tx = pxsol.core.Transaction.requisition_decode(self.pubkey, [r0, r1])
-        tx.message.recent_blockhash = pxsol.base58.decode(pxsol.rpc.get_latest_blockhash({})['blockhash'])
+        tx.message.recent_blockhash = pxsol.base58.decode32(pxsol.rpc.get_latest_blockhash({})['blockhash'])
         tx.sign([self.prikey])
         txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
         pxsol.rpc.wait([txid])
@@ -0,0 +1,52 @@
+import pxsol
+import pytest
+import random
+
+
+def test_base58():
+    case = [
+        ['', ''],
+        ['61', '2g'],
+        ['626262', 'a3gV'],
+        ['636363', 'aPEr'],
+        ['73696d706c792061206c6f6e6720737472696e67', '2cFupjhnEsSn59qHXstmK2ffpLv2'],
+        ['00eb15231dfceb60925886b67d065299925915aeb172c06647', '1NS17iag9jJgTHD1VXjvLCEnZuQ3rJDE9L'],
+        ['516b6fcd0f', 'ABnLTmg'],
+        ['bf4f89001e670274dd', '3SEo3LWLoPntC'],
+        ['572e4794', '3EFU7m'],
+        ['ecac89cad93923c02321', 'EJDM8drfXA6uyA'],
+        ['10c8511e', 'Rt5zm'],
+        ['00000000000000000000', '1111111111'],
+    ]
+    for e in case:
+        assert pxsol.base58.encode(bytearray.fromhex(e[0])) == e[1]
+        assert pxsol.base58.encode(bytes.fromhex(e[0])) == e[1]
+        assert pxsol.base58.decode(e[1]) == bytearray.fromhex(e[0])
+
+
+def test_base58_size():
+    for size in [32, 64]:
+        for pad in range(4):
+            data = [bytearray(pad) + bytearray(random.randbytes(size - pad)) for _ in range(8)]
+            text = pxsol.base58.encode_many(data)
+            assert pxsol.base58.decode_many(text, size) == data
+            assert [pxsol.base58.decode(e) for e in text] == data
+    assert pxsol.base58.encode(bytearray(32)) == '1' * 32
+    assert pxsol.base58.decode32('1' * 32) == bytearray(32)
+    assert pxsol.base58.decode64(pxsol.base58.encode(bytearray([0xff] * 64))) == bytearray([0xff] * 64)
+
+
+def test_base58_invalid():
+    with pytest.raises(AssertionError):
+        pxsol.base58.decode('0')
+    with pytest.raises(AssertionError):
+        pxsol.base58.decode('6ASf5EcmmEHTgDJ4X4ZT5vT6iHVJBXPg5AN5YoTCpGWl')
+    # Too large for 32 bytes.
+    with pytest.raises(AssertionError):
+        pxsol.base58.decode32('z' * 44)
+    # Not the canonical encoding of a 32-byte value: a leading zero byte without its base58 zero.
+    with pytest.raises(AssertionError):
+        pxsol.base58.decode32(pxsol.base58.encode(bytearray([0xff] * 31)))
+    # Too many base58 zeros.
+    with pytest.raises(AssertionError):
+        pxsol.base58.decode32('1' * 33)
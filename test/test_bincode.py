@@ -0,0 +1,96 @@
+import io
+import pxsol
+import pytest
+
+
+def test_string():
+    case = ['hello', bytearray([5, 0, 0, 0, 0, 0, 0, 0, 104, 101, 108, 108, 111])]
+    assert pxsol.bincode.String.encode(case[0]) == case[1]
+    assert pxsol.bincode.String.decode(io.BytesIO(case[1])) == case[0]
+
+
+def test_struct():
+    case = [
+        [1, [2, 3], 'k', None],
+        bytearray([
+            0x01, 0x00, 0x00, 0x00, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x02, 0x03, 0x01, 0x00,
+            0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x6b, 0x00,
+        ])
+    ]
+    kype = pxsol.bincode.Struct([
+        pxsol.bincode.Enum,
+        pxsol.bincode.Slice(pxsol.bincode.U8),
+        pxsol.bincode.String,
+        pxsol.bincode.Option(pxsol.bincode.U64),
+    ])
+    assert kype.encode(case[0]) == case[1]
+    assert kype.decode(io.BytesIO(case[1])) == case[0]
+    assert kype.decode_buffer(memoryview(case[1]), 0) == (case[0], len(case[1]))
+
+
+def test_decode_buffer():
+    kype = pxsol.bincode.Dict([pxsol.bincode.U32, pxsol.bincode.Array(pxsol.bincode.F32, 2)])
+    data = kype.encode({1: [0.5, 1.5], 2: [-0.5, -1.5]})
+    assert kype.decode_buffer(memoryview(data), 0) == (kype.decode(io.BytesIO(data)), len(data))
+
+
+def test_compile():
+    kype = pxsol.bincode.Struct([
+        pxsol.bincode.Enum,
+        pxsol.bincode.U64,
+        pxsol.bincode.Slice(pxsol.bincode.U8),
+        pxsol.bincode.Array(pxsol.bincode.U8, 32),
+        pxsol.bincode.Dict([pxsol.bincode.U32, pxsol.bincode.String]),
+        pxsol.bincode.Option(pxsol.bincode.U64),
+        pxsol.bincode.I128,
+    ])
+    data = [3, 1 << 40, [1, 2, 3], list(range(32)), {2: 'b', 1: 'a'}, 4, -5]
+    compiled = pxsol.bincode.compile(kype)
+    assert compiled.encode(data) == kype.encode(data)
+    assert compiled.decode(io.BytesIO(kype.encode(data))) == data
+    assert compiled.decode_buffer(memoryview(kype.encode(data)), 0) == (data, len(kype.encode(data)))
+
+
+def test_read_field():
+    kype = pxsol.bincode.Struct([pxsol.bincode.Enum, pxsol.bincode.U64, pxsol.bincode.Slice(pxsol.bincode.U8)])
+    buf = memoryview(kype.encode([2, 3, [4]]))
+    assert pxsol.bincode.field(kype, '2') == (12, kype.kype[2])
+    assert kype.read_field(buf, '1') == 3
+    assert pxsol.bincode.View(kype, buf, 0)[2] == [4]
+    assert kype.offset == [0, 4, 12]
+
+
+def test_iter_decode():
+    kype = pxsol.bincode.Dict([pxsol.bincode.U8, pxsol.bincode.Slice(pxsol.bincode.U8)])
+    data = kype.encode({1: [2], 3: []})
+    assert list(kype.iter_decode(io.BytesIO(data))) == [(1, [2]), (3, [])]
+    assert [e[0] for e in kype.iter_decode_buffer(memoryview(data), 0)] == [(1, [2]), (3, [])]
+    assert list(pxsol.bincode.Slice(pxsol.bincode.U8).iter_decode(io.BytesIO(bytearray([1] + [0] * 7 + [9])))) == [9]
+
+
+def test_encode_into():
+    kype = pxsol.bincode.Slice(pxsol.bincode.Struct([pxsol.bincode.String, pxsol.bincode.U128]))
+    data = [['a', 1], ['bc', 2]]
+    assert kype.size_of(data) == 8 + 9 + 16 + 10 + 16
+    buf = bytearray(kype.size_of(data))
+    assert kype.encode_into(data, buf, 0) == len(buf)
+    assert kype.decode(io.BytesIO(buf)) == data
+
+
+def test_decode_buffer_truncated():
+    data = memoryview(bytearray(3))
+    for kype in [pxsol.bincode.U32, pxsol.bincode.I64, pxsol.bincode.F64]:
+        with pytest.raises(EOFError):
+            kype.decode_buffer(data, 0)
+        with pytest.raises(EOFError):
+            kype.decode_buffer(data, 3)
+    kype = pxsol.bincode.Struct([pxsol.bincode.U8, pxsol.bincode.U16, pxsol.bincode.U64])
+    with pytest.raises(EOFError):
+        kype.decode_buffer(memoryview(bytearray(10)), 0)
+    with pytest.raises(EOFError):
+        pxsol.bincode.compile(kype).decode_buffer(memoryview(bytearray(10)), 0)
+    kype = pxsol.bincode.compile(pxsol.bincode.Slice(pxsol.bincode.U32))
+    with pytest.raises(EOFError):
+        kype.decode_buffer(memoryview(bytearray(2)), 0)
+    with pytest.raises(EOFError):
+        kype.decode_buffer(memoryview(bytearray([3] + [0] * 11)), 0)
@@ -1,5 +1,6 @@
 import io
 import pxsol
+import pytest
 
 
 def test_bool():
@@ -97,3 +98,147 @@ def test_string():
     case = ['hello', bytearray([5, 0, 0, 0, 104, 101, 108, 108, 111])]
     assert pxsol.borsh.String.encode(case[0]) == case[1]
     assert pxsol.borsh.String.decode(io.BytesIO(case[1])) == case[0]
+
+
+def test_decode_buffer():
+    pubkey = pxsol.borsh.Custom(lambda r: pxsol.core.PubKey(pxsol.io.read_full(r, 32)))
+    for case in [
+        [pxsol.borsh.Bool, True],
+        [pxsol.borsh.I8, -128],
+        [pxsol.borsh.U64, 18446744073709551615],
+        [pxsol.borsh.I128, -170141183460469231731687303715884105728],
+        [pxsol.borsh.F64, -0.5],
+        [pxsol.borsh.String, 'hello'],
+        [pxsol.borsh.Array(pxsol.borsh.U8, 4), [1, 2, 3, 4]],
+        [pxsol.borsh.Slice(pxsol.borsh.U8), [1, 2, 3]],
+        [pxsol.borsh.Slice(pxsol.borsh.I16), [1, -1]],
+        [pxsol.borsh.Dict([pxsol.borsh.String, pxsol.borsh.U32]), {'k': 1, 'v': 2}],
+        [pxsol.borsh.Option(pxsol.borsh.U16), None],
+    ]:
+        data = bytearray([0xff]) + case[0].encode(case[1]) + bytearray([0xff])
+        assert case[0].decode_buffer(memoryview(data), 1) == (case[1], len(data) - 1)
+    kype = pxsol.borsh.Struct([pubkey, pxsol.borsh.Option(pxsol.borsh.U16)])
+    data = kype.encode([bytearray(32), 13])
+    assert kype.decode_buffer(memoryview(data), 0) == ([pxsol.program.System.pubkey, 13], len(data))
+    with pytest.raises(EOFError):
+        pxsol.borsh.Slice(pxsol.borsh.U8).decode_buffer(memoryview(bytearray([4, 0, 0, 0, 1, 2, 3])), 0)
+
+
+def test_compile():
+    kype = pxsol.borsh.Struct([
+        pxsol.borsh.U8,
+        pxsol.borsh.I64,
+        pxsol.borsh.Bool,
+        pxsol.borsh.Array(pxsol.borsh.U8, 4),
+        pxsol.borsh.U128,
+        pxsol.borsh.Slice(pxsol.borsh.Struct([pxsol.borsh.String, pxsol.borsh.F32])),
+        pxsol.borsh.Slice(pxsol.borsh.U16),
+        pxsol.borsh.Dict([pxsol.borsh.String, pxsol.borsh.Option(pxsol.borsh.I32)]),
+        pxsol.borsh.Option(pxsol.borsh.Array(pxsol.borsh.I16, 2)),
+        pxsol.borsh.Enum,
+        pxsol.borsh.Custom(lambda r: pxsol.io.read_full(r, 2)),
+    ])
+    data = [1, -2, True, [1, 2, 3, 4], 5, [['a', 0.5], ['b', 1.5]], [6, 7], {'b': None, 'a': -8}, [-9, 10], 11,
+            bytearray([12, 13])]
+    compiled = pxsol.borsh.compile(kype)
+    assert compiled.encode(data) == kype.encode(data)
+    assert compiled.decode(io.BytesIO(kype.encode(data))) == data
+    assert compiled.decode_buffer(memoryview(kype.encode(data)), 0) == (data, len(kype.encode(data)))
+    assert pxsol.borsh.compile(compiled) is compiled
+    with pytest.raises(AssertionError):
+        compiled.encode(data[:-1])
+
+
+def test_read_field():
+    kype = pxsol.borsh.Struct([
+        pxsol.borsh.Array(pxsol.borsh.U8, 32),
+        pxsol.borsh.U64,
+        pxsol.borsh.Struct([pxsol.borsh.Bool, pxsol.borsh.Array(pxsol.borsh.I16, 3)]),
+        pxsol.borsh.U128,
+        pxsol.borsh.String,
+    ])
+    data = [list(range(32)), 1 << 40, [True, [-1, -2, -3]], 1 << 100, 'hello']
+    buf = memoryview(kype.encode(data))
+    assert pxsol.borsh.fixed_size(kype) is None
+    assert pxsol.borsh.fixed_size(kype.kype[2]) == 7
+    assert pxsol.borsh.field(kype, '2.1.2') == (45, pxsol.borsh.I16)
+    assert kype.read_field(buf, '0.5') == 5
+    assert kype.read_field(buf, '1') == 1 << 40
+    assert kype.read_field(buf, '2.1') == [-1, -2, -3]
+    assert kype.read_field(buf, '4') == 'hello'
+    view = pxsol.borsh.View(kype, buf, 0)
+    assert view[1] == 1 << 40
+    assert view[2][1][2] == -3
+    assert list(view[2][1]) == [-1, -2, -3]
+    assert view.decode() == data
+    # The layout is stored on the schema, a field behind one of variable size cannot be addressed.
+    assert kype.offset == [0, 32, 40, 47, 63]
+    assert kype.kype[0].stride == 1
+    with pytest.raises(AssertionError):
+        pxsol.borsh.Struct([pxsol.borsh.String, pxsol.borsh.U8]).read_field(memoryview(bytearray(5)), '1')
+
+
+def test_iter_decode():
+    kype = pxsol.borsh.Slice(pxsol.borsh.String)
+    data = kype.encode(['a', 'bc']) + pxsol.borsh.U8.encode(7)
+    reader = io.BytesIO(data)
+    assert list(kype.iter_decode(reader)) == ['a', 'bc']
+    assert pxsol.borsh.U8.decode(reader) == 7
+    assert list(kype.iter_decode_buffer(memoryview(data), 0)) == [('a', 9), ('bc', 15)]
+    kype = pxsol.borsh.Dict([pxsol.borsh.U8, pxsol.borsh.U16])
+    data = kype.encode({1: 2, 3: 4})
+    assert list(kype.iter_decode(io.BytesIO(data))) == [(1, 2), (3, 4)]
+    assert list(kype.iter_decode_buffer(memoryview(data), 0)) == [((1, 2), 7), ((3, 4), 10)]
+
+
+def test_numpy_decode():
+    numpy = pytest.importorskip('numpy')
+    kype = pxsol.borsh.Struct([
+        pxsol.borsh.Array(pxsol.borsh.U8, 32),
+        pxsol.borsh.U64,
+        pxsol.borsh.Struct([pxsol.borsh.Bool, pxsol.borsh.I16]),
+        pxsol.borsh.U128,
+    ])
+    data = [kype.encode([[i] * 32, i << 40, [i % 2 == 0, -i], i]) + bytearray(i) for i in range(4)]
+    r = pxsol.borsh.numpy_decode(kype, data)
+    assert r.dtype.itemsize == pxsol.borsh.fixed_size(kype)
+    assert r['f0'].shape == (4, 32)
+    assert r['f0'][3][31] == 3
+    assert r['f1'].sum() == 6 << 40
+    assert list(r['f2']['f0']) == [True, False, True, False]
+    assert r['f2']['f1'][3] == -3
+    assert int.from_bytes(r['f3'][2].tobytes(), 'little') == 2
+    assert numpy.all(r['f1'] == numpy.array([0, 1 << 40, 2 << 40, 3 << 40], dtype=numpy.uint64))
+
+
+def test_encode_into():
+    kype = pxsol.borsh.Struct([
+        pxsol.borsh.U16,
+        pxsol.borsh.Slice(pxsol.borsh.Array(pxsol.borsh.U8, 2)),
+        pxsol.borsh.Dict([pxsol.borsh.String, pxsol.borsh.Option(pxsol.borsh.U8)]),
+    ])
+    data = [1, [[2, 3], [4, 5]], {'b': None, 'a': 6}]
+    assert kype.size_of(data) == 2 + 4 + 4 + 4 + 5 + 2 + 5 + 1
+    buf = bytearray(kype.size_of(data) + 2)
+    assert kype.encode_into(data, buf, 1) == len(buf) - 1
+    assert buf[1:-1] == kype.encode(data)
+    assert kype.decode(io.BytesIO(buf[1:-1])) == data
+
+
+def test_decode_buffer_truncated():
+    data = memoryview(bytearray(3))
+    for kype in [pxsol.borsh.U32, pxsol.borsh.I64, pxsol.borsh.F64]:
+        with pytest.raises(EOFError):
+            kype.decode_buffer(data, 0)
+        with pytest.raises(EOFError):
+            kype.decode_buffer(data, 3)
+    kype = pxsol.borsh.Struct([pxsol.borsh.U8, pxsol.borsh.U16, pxsol.borsh.U64])
+    with pytest.raises(EOFError):
+        kype.decode_buffer(memoryview(bytearray(10)), 0)
+    with pytest.raises(EOFError):
+        pxsol.borsh.compile(kype).decode_buffer(memoryview(bytearray(10)), 0)
+    kype = pxsol.borsh.compile(pxsol.borsh.Slice(pxsol.borsh.U32))
+    with pytest.raises(EOFError):
+        kype.decode_buffer(memoryview(bytearray(2)), 0)
+    with pytest.raises(EOFError):
+        kype.decode_buffer(memoryview(bytearray([3] + [0] * 11)), 0)
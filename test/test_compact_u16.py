@@ -46,3 +46,12 @@ def test_compact_u16_random():
     for _ in range(8):
         n = random.randint(0, 0xffff)
         assert pxsol.compact_u16.decode(pxsol.compact_u16.encode(n)) == n
+
+
+def test_compact_u16_buffer():
+    for n in [0x00, 0x7f, 0x80, 0x3fff, 0x4000, 0xffff]:
+        data = bytearray([0xff]) + pxsol.compact_u16.encode(n)
+        assert pxsol.compact_u16.decode_buffer(memoryview(data), 1) == (n, len(data))
+    for e in [bytearray([0x80, 0x00]), bytearray([0xff, 0x80]), bytearray([0x80, 0x80, 0x04])]:
+        with pytest.raises((AssertionError, EOFError)):
+            pxsol.compact_u16.decode_buffer(memoryview(e), 0)
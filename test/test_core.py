@@ -1,4 +1,9 @@
+import concurrent.futures
+import json
+import pickle
 import pxsol
+import pytest
+import random
 
 
 def test_addr():
@@ -22,6 +27,37 @@ def test_prikey():
     assert prikey == pxsol.core.PriKey.wif_decode(prikey.wif())
 
 
+def test_prikey_sign():
+    prikey = pxsol.core.PriKey.int_decode(1)
+    data = bytearray([0x00, 0x01, 0x02])
+    assert prikey.sign(data) == pxsol.eddsa.sign(prikey.p, data)
+    assert prikey.sign(data) == pxsol.eddsa.sign(prikey.p, data)
+    assert prikey.pubkey().p == pxsol.eddsa.pubkey(prikey.p)
+    prikey.p[31] = 2
+    assert prikey.pubkey().base58() == '8pM1DN3RiT8vbom5u1sNryaNT1nyL8CTTW3b5PwWXRBH'
+
+
+def test_pubkey():
+    pubkey = pxsol.core.PubKey.base58_decode('6ASf5EcmmEHTgDJ4X4ZT5vT6iHVJBXPg5AN5YoTCpGWt')
+    assert pubkey.base58() == '6ASf5EcmmEHTgDJ4X4ZT5vT6iHVJBXPg5AN5YoTCpGWt'
+    assert pubkey == pxsol.core.PubKey.hex_decode(pubkey.hex())
+    assert pubkey == pickle.loads(pickle.dumps(pubkey))
+    assert len({pubkey, pxsol.core.PubKey(bytearray(pubkey.p))}) == 1
+    with pytest.raises(AttributeError):
+        pubkey.p = bytes(32)
+
+
+def test_pubkey_intern():
+    assert pxsol.core.PubKey(bytearray(32)).intern() is pxsol.program.System.pubkey
+    tx = pxsol.core.Transaction.requisition_decode(pxsol.core.PriKey.int_decode(1).pubkey(), [
+        pxsol.core.Requisition(pxsol.program.System.pubkey, [], bytearray()),
+    ])
+    tx.message.recent_blockhash = bytearray(32)
+    tx = pxsol.core.Transaction.serialize_decode(tx.serialize())
+    assert tx.message.account_keys[1] is pxsol.program.System.pubkey
+    assert tx.message.account_keys[0].p not in pxsol.core.pubkey_intern
+
+
 def test_pubkey_derive():
     pubkey = pxsol.core.PubKey.base58_decode('32X6yNMyXnNdN9udjvhB3fHNHXXgAp7haUJ33irZf7mj')
     seed = bytearray([0x00])
@@ -37,6 +73,137 @@ def test_pubkey_derive_pda():
     assert pubkey.derive_pda(seed)[0].base58() == 'Eb6T9mLCxAE1FxAXbCGpB5TN3yMbgo9rsP8A8HWGwuXc'
 
 
+def test_pubkey_create_pda():
+    pubkey = pxsol.core.PubKey.base58_decode('BPFLoaderUpgradeab1e11111111111111111111111')
+    seed = bytearray(int(1).to_bytes(32))
+    pda, bump = pubkey.derive_pda(seed)
+    assert pubkey.create_pda(seed, bump) == pda
+
+
+def test_pubkey_derive_pda_many():
+    pubkey = pxsol.core.PubKey.base58_decode('BPFLoaderUpgradeab1e11111111111111111111111')
+    seed = [bytearray(int(i).to_bytes(32)) for i in range(600)]
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        pda = list(pxsol.core.derive_pda_many(pubkey, seed, executor))
+    assert len(pda) == 600
+    assert pda[0][0].base58() == '5ReXsszTZPmCZuH7wHPoEkxqRq3Bb1xWWcim13zDH6LX'
+    assert pda[1][0].base58() == 'Eb6T9mLCxAE1FxAXbCGpB5TN3yMbgo9rsP8A8HWGwuXc'
+    assert pda[599] == pubkey.derive_pda(seed[599])
+    owner = [pxsol.core.PriKey.int_decode(1).pubkey()]
+    mint = pxsol.core.PubKey.base58_decode(pxsol.config.mainnet.spl.usdc)
+    host = pxsol.program.Token.pubkey_2020
+    ata = list(pxsol.core.derive_ata_many(owner, mint, host))
+    assert ata[0] == pxsol.program.AssociatedTokenAccount.pubkey.derive_pda(owner[0].p + host.p + mint.p)
+
+
+def test_sign_many():
+    user = [pxsol.core.PriKey.int_decode(i) for i in range(1, 4)]
+    tx = []
+    for i in range(130):
+        rq = pxsol.core.Requisition(pxsol.program.System.pubkey, [], bytearray())
+        rq.account.append(pxsol.core.AccountMeta(user[i % 3].pubkey(), 3))
+        tx.append(pxsol.core.Transaction.requisition_decode(user[(i + 1) % 3].pubkey(), [rq]))
+        tx[i].message.recent_blockhash = bytearray(i.to_bytes(32))
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        pxsol.core.sign_many(tx, user, executor)
+    for e in tx:
+        assert len(e.signatures) == 2
+        signer = [user[i] for i in range(3) if user[i].pubkey() in e.message.account_keys[:2]]
+        clone = pxsol.core.Transaction([], e.message)
+        clone.sign(signer)
+        assert clone.signatures == e.signatures
+
+
+def test_requisition_pack():
+    user = [pxsol.core.PriKey.int_decode(i) for i in range(1, 4)]
+    rq = []
+    for i in range(200):
+        into = pxsol.core.PubKey(bytearray(random.randbytes(32))) if i % 3 else user[2].pubkey()
+        rq.append(pxsol.core.Requisition(pxsol.program.System.pubkey, [], pxsol.program.System.transfer(i)))
+        rq[i].account.append(pxsol.core.AccountMeta(user[i % 7 // 6].pubkey(), 3))
+        rq[i].account.append(pxsol.core.AccountMeta(into, 1 + (i % 5 == 0) * 2))
+        rq[i].account.append(pxsol.core.AccountMeta(pxsol.program.SysvarRent.pubkey, 0))
+    addr = [e.pubkey for r in rq for e in r.account]
+    tables = {
+        pxsol.core.PriKey.int_decode(4).pubkey(): addr[::2][:256],
+        pxsol.core.PriKey.int_decode(5).pubkey(): addr[::-3][:256] + [pxsol.program.System.pubkey],
+    }
+    for size, lock, lookup_tables in [(1232, 64, None), (1232, 16, None), (600, 64, None), (1232, 64, tables)]:
+        pack = pxsol.core.requisition_pack(user[0].pubkey(), rq, size, lock, lookup_tables)
+        assert sum(pack, []) == rq
+        for i, e in enumerate(pack):
+            for f in [e, e + pack[i + 1][:1]] if i + 1 < len(pack) else [e]:
+                if lookup_tables is None:
+                    tx = pxsol.core.Transaction.requisition_decode(user[0].pubkey(), f)
+                    n = len(tx.message.account_keys)
+                else:
+                    tx = pxsol.core.TransactionV0.requisition_decode(user[0].pubkey(), f, lookup_tables)
+                    n = len(tx.message.account_keys) + sum([
+                        len(t.writable_indexes) + len(t.readonly_indexes) for t in tx.message.address_table_lookups
+                    ])
+                tx.message.recent_blockhash = bytearray(32)
+                tx.signatures = [bytearray(64)] * tx.message.header.required_signatures
+                fits = len(tx.serialize()) <= size and n <= lock
+                assert fits == (f is e)
+
+
+def test_pubkey_pda_cache(tmp_path):
+    pubkey = pxsol.core.PubKey.base58_decode('BPFLoaderUpgradeab1e11111111111111111111111')
+    path = tmp_path.joinpath('pda.json').as_posix()
+    cache = pxsol.core.PdaCache(2, path)
+    for i in range(3):
+        seed = bytearray(int(i).to_bytes(32))
+        cache.put(pubkey, seed, pubkey.derive_pda(seed))
+    assert cache.get(pubkey, bytearray(int(0).to_bytes(32))) is None
+    assert cache.get(pubkey, bytearray(int(1).to_bytes(32)))[0] == pubkey.derive_pda(bytearray(int(1).to_bytes(32)))[0]
+    cache.save()
+    cache = pxsol.core.PdaCache(2, path)
+    assert cache.get(pubkey, bytearray(int(1).to_bytes(32)))[0] == pubkey.derive_pda(bytearray(int(1).to_bytes(32)))[0]
+    assert cache.get(pubkey, bytearray(int(2).to_bytes(32))) is not None
+
+
+def test_pubkey_pda_cache_forged(tmp_path):
+    pubkey = pxsol.core.PubKey.base58_decode('BPFLoaderUpgradeab1e11111111111111111111111')
+    path = tmp_path.joinpath('pda.json')
+    cache = pxsol.core.PdaCache(8, path.as_posix())
+    for i in range(3):
+        seed = bytearray(int(i).to_bytes(32))
+        cache.put(pubkey, seed, pubkey.derive_pda(seed))
+    cache.save()
+    data = json.loads(path.read_text())
+    # Point the second entry at an address of the attacker's choice, and append entries which do not parse.
+    data[1][2] = pxsol.core.PriKey.int_decode(1).pubkey().base58()
+    data.append([data[0][0], 'zz', data[0][2], data[0][3]])
+    data.append([data[0][0], data[0][1], data[0][2], 256])
+    data.append([data[0][0]])
+    path.write_text(json.dumps(data))
+    cache = pxsol.core.PdaCache(8, path.as_posix())
+    assert len(cache.data) == 2
+    assert cache.get(pubkey, bytearray(int(0).to_bytes(32))) == pubkey.derive_pda(bytearray(int(0).to_bytes(32)))
+    assert cache.get(pubkey, bytearray(int(1).to_bytes(32))) is None
+    assert cache.get(pubkey, bytearray(int(2).to_bytes(32))) == pubkey.derive_pda(bytearray(int(2).to_bytes(32)))
+    path.write_text('{')
+    assert len(pxsol.core.PdaCache(8, path.as_posix()).data) == 0
+
+
+def test_pubkey_pda_cache_forged_bump(tmp_path):
+    # A lower bump whose hash also falls off the curve gives a valid program address, but not the canonical one.
+    pubkey = pxsol.core.PubKey.base58_decode('BPFLoaderUpgradeab1e11111111111111111111111')
+    path = tmp_path.joinpath('pda.json')
+    for i in range(64):
+        seed = bytearray(int(i).to_bytes(32))
+        pda, bump = pubkey.derive_pda(seed)
+        try:
+            forged = pubkey.create_pda(seed, bump - 1)
+        except AssertionError:
+            continue
+        break
+    assert forged != pda
+    path.write_text(json.dumps([[pubkey.base58(), seed.hex(), forged.base58(), bump - 1]]))
+    cache = pxsol.core.PdaCache(8, path.as_posix())
+    assert cache.get(pubkey, seed) is None
+
+
 def test_transaction():
     data = bytearray([
         0x01, 0xc5, 0x2e, 0xfc, 0x4e, 0x7b, 0x7f, 0x9c, 0x10, 0x45, 0xd5, 0xc8, 0x2a, 0x87, 0xea, 0x69,
@@ -114,3 +281,132 @@ def test_transaction_v0():
     ])
     tx = pxsol.core.TransactionV0.serialize_decode(data)
     assert tx.serialize() == data
+
+
+def test_transaction_v0_requisition_decode():
+    user = [pxsol.core.PriKey.int_decode(1), pxsol.core.PriKey.int_decode(2)]
+    addr = [pxsol.core.PriKey.int_decode(i).pubkey() for i in range(3, 13)]
+    tables = {
+        addr[0]: [addr[4], addr[5], addr[6], user[1].pubkey()],
+        addr[1]: [addr[6], addr[7], addr[8], pxsol.program.Token.pubkey_2022, addr[9]],
+    }
+    rq = []
+    for i in range(6):
+        rq.append(pxsol.core.Requisition(pxsol.program.Token.pubkey_2022, [], bytearray([i])))
+        rq[i].account.append(pxsol.core.AccountMeta(addr[2 + i], 1))
+        rq[i].account.append(pxsol.core.AccountMeta(addr[9 - i], i % 2))
+        rq[i].account.append(pxsol.core.AccountMeta(user[i % 2].pubkey(), 2))
+    tx = pxsol.core.TransactionV0.requisition_decode(user[0].pubkey(), rq, tables)
+    m = tx.message
+    assert m.account_keys[:2] == [user[0].pubkey(), user[1].pubkey()]
+    assert m.header.json() == [2, 1, 1]
+    assert pxsol.program.Token.pubkey_2022 in m.account_keys
+    assert [e.account_key for e in m.address_table_lookups] == [addr[0], addr[1]]
+    assert m.address_table_lookups[0].writable_indexes == [0, 1, 2]
+    assert m.address_table_lookups[0].readonly_indexes == []
+    assert m.address_table_lookups[1].writable_indexes == [2, 1]
+    assert m.address_table_lookups[1].readonly_indexes == [4]
+    # Resolve the loaded accounts the way the runtime does, and check the accounts and modes of the instructions.
+    writable = [tables[e.account_key][i] for e in m.address_table_lookups for i in e.writable_indexes]
+    readonly = [tables[e.account_key][i] for e in m.address_table_lookups for i in e.readonly_indexes]
+    keys = m.account_keys + writable + readonly
+    n = len(m.account_keys)
+    for r, e in zip(rq, m.instructions):
+        assert keys[e.program] == r.program
+        assert e.program < n
+        assert [keys[i] for i in e.account] == [a.pubkey for a in r.account]
+        for a, i in zip(r.account, e.account):
+            w = i < m.header.required_signatures - m.header.readonly_signatures
+            w = w or m.header.required_signatures <= i < n - m.header.readonly or n <= i < n + len(writable)
+            mode = [b.mode for s in rq for b in s.account if b.pubkey == a.pubkey]
+            assert w == (a.pubkey == user[0].pubkey() or any([e & 1 for e in mode]))
+    tx.message.recent_blockhash = bytearray(32)
+    tx.sign(user)
+    assert pxsol.core.TransactionV0.serialize_decode(tx.serialize()).serialize() == tx.serialize()
+    assert len(tx.serialize()) < len(pxsol.core.Transaction.requisition_decode(user[0].pubkey(), rq).serialize()) + 128
+
+
+def test_transaction_view():
+    user = pxsol.core.PriKey.int_decode(1)
+    into = pxsol.core.PriKey.int_decode(2).pubkey()
+    rq = pxsol.core.Requisition(pxsol.program.System.pubkey, [], pxsol.program.System.transfer(1))
+    rq.account.append(pxsol.core.AccountMeta(user.pubkey(), 3))
+    rq.account.append(pxsol.core.AccountMeta(into, 1))
+    tx = pxsol.core.Transaction.requisition_decode(user.pubkey(), [rq])
+    tx.message.recent_blockhash = bytearray([0x42] * 32)
+    tx.sign([user])
+    data = tx.serialize()
+    view = pxsol.core.TransactionView(memoryview(data))
+    assert not view.v0
+    assert view.size == len(data)
+    assert view.signature(0) == tx.signatures[0]
+    assert view.header().json() == tx.message.header.json()
+    assert view.account_key(2) == pxsol.program.System.pubkey.p
+    assert view.recent_blockhash() == tx.message.recent_blockhash
+    assert view.instruction_count() == 1
+    assert view.account_key(view.instruction_program(0)) == pxsol.program.System.pubkey.p
+    assert view.instruction(0).json() == tx.message.instructions[0].json()
+    assert view.message() == tx.message.serialize()
+    assert view.decode().serialize() == data
+    tx = pxsol.core.TransactionV0([bytearray(64)], pxsol.core.MessageV0(
+        tx.message.header,
+        tx.message.account_keys,
+        tx.message.recent_blockhash,
+        tx.message.instructions + [pxsol.core.Instruction(2, [0, 3], bytearray([1, 2]))],
+        [pxsol.core.AddressTableLookup(into, [1, 2], [3])],
+    ))
+    data = tx.serialize()
+    view = pxsol.core.TransactionView(data)
+    assert view.v0
+    assert view.size == len(data)
+    assert view.instruction(1).json() == tx.message.instructions[1].json()
+    assert view.message() == tx.message.serialize()
+    assert view.decode().serialize() == data
+    with pytest.raises(EOFError):
+        pxsol.core.TransactionView(data[:-1])
+
+
+def test_message_serialize_in_place():
+    user = pxsol.core.PriKey.int_decode(1)
+    rq = pxsol.core.Requisition(pxsol.program.System.pubkey, [], pxsol.program.System.transfer(1))
+    rq.account.append(pxsol.core.AccountMeta(user.pubkey(), 3))
+    tx = pxsol.core.Transaction.requisition_decode(user.pubkey(), [rq])
+    tx.message.recent_blockhash = bytearray(32)
+    data = tx.message.serialize()
+    assert tx.message.serialize_size() == len(data)
+    data[0] = 0xff
+    assert tx.message.serialize() != data
+    # Edits made in place are always seen by the next serialize.
+    tx.message.recent_blockhash[:] = bytearray([1] * 32)
+    assert tx.message.serialize()[-len(rq.data) - 37:-len(rq.data) - 5] == bytearray([1] * 32)
+    tx.message.instructions[0].data[4] = 2
+    assert tx.message.serialize()[-len(rq.data):] == pxsol.program.System.transfer(2)
+    tx.message.instructions.append(tx.message.instructions[0])
+    assert pxsol.core.Message.serialize_decode(tx.message.serialize()).instructions[1].data == rq.data
+    tx.message.instructions.pop()
+    tx.sign([user])
+    assert len(tx.serialize()) == tx.serialize_size()
+    assert pxsol.core.Transaction.serialize_decode(tx.serialize()).message.serialize() == tx.message.serialize()
+    tx.message.header.readonly = 0
+    assert not pxsol.eddsa.verify(user.pubkey().p, tx.message.serialize(), tx.signatures[0])
+
+
+def test_transaction_template():
+    user = [pxsol.core.PriKey.int_decode(1), pxsol.core.PriKey.int_decode(2)]
+    into = pxsol.core.PriKey.int_decode(3).pubkey()
+    rq = []
+    for i in range(3):
+        rq.append(pxsol.core.Requisition(pxsol.program.System.pubkey, [], pxsol.program.System.transfer(i)))
+        rq[i].account.append(pxsol.core.AccountMeta(user[i % 2].pubkey(), 3))
+        rq[i].account.append(pxsol.core.AccountMeta(into, 1))
+    tmpl = pxsol.core.TransactionTemplate(user[::-1], rq)
+    for data in [
+        [pxsol.program.System.transfer(4), pxsol.program.System.transfer(5), pxsol.program.System.transfer(6)],
+        [bytearray(), bytearray(200), bytearray([7])],
+    ]:
+        for i in range(3):
+            rq[i].data = data[i]
+        tx = pxsol.core.Transaction.requisition_decode(user[1].pubkey(), rq)
+        tx.message.recent_blockhash = bytearray([0x42] * 32)
+        tx.sign(user)
+        assert tmpl.build(bytearray([0x42] * 32), data) == tx.serialize()
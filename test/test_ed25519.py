@@ -1,4 +1,5 @@
 import pxsol
+import random
 
 
 def test_g():
@@ -11,3 +12,42 @@ def test_g():
     q = pxsol.ed25519.G * pxsol.ed25519.Fr(3)
     assert q.x.n == 0x67ae9c4a22928f491ff4ae743edac83a6343981981624886ac62485fd3f8e25c
     assert q.y.n == 0x1267b1d177ee69aba126a18e60269ef79f16ec176724030402c3684878f5b4d4
+
+
+def test_ext():
+    p = pxsol.ed25519.G * pxsol.ed25519.Fr(42)
+    q = pxsol.ed25519.G.ext() * pxsol.ed25519.Fr(42)
+    assert q.pt() == p
+    assert q.double() == q + q
+    assert (q - q).pt() == pxsol.ed25519.I
+
+
+def test_mul_base():
+    for k in [0, 1, 2, 15, 16, 255, pxsol.ed25519.N - 1]:
+        k = pxsol.ed25519.Fr(k)
+        assert pxsol.ed25519.mul_base(k) == pxsol.ed25519.G.ext() * k
+
+
+def test_mul_multi():
+    p = [pxsol.ed25519.G.ext() * pxsol.ed25519.Fr(random.randint(1, pxsol.ed25519.N - 1)) for _ in range(4)]
+    k = [pxsol.ed25519.Fr(random.randint(1, pxsol.ed25519.N - 1)) for _ in range(4)]
+    r = p[0] * k[0] + p[1] * k[1] + p[2] * k[2] + p[3] * k[3]
+    assert pxsol.ed25519.mul_straus(p, k) == r
+    assert pxsol.ed25519.mul_pippenger(p, k) == r
+
+
+def test_mul_double():
+    for _ in range(4):
+        a = pxsol.ed25519.Fr(random.randint(0, pxsol.ed25519.N - 1))
+        b = pxsol.ed25519.Fr(random.randint(0, pxsol.ed25519.N - 1))
+        p = pxsol.ed25519.G.ext() * pxsol.ed25519.Fr(random.randint(1, pxsol.ed25519.N - 1))
+        assert pxsol.ed25519.mul_double(a, p, b) == pxsol.ed25519.G.ext() * a + p * b
+
+
+def test_pt_torsion_free():
+    t = pxsol.ed25519.Pt(pxsol.ed25519.Fq(0), -pxsol.ed25519.Fq(1))
+    p = pxsol.ed25519.G * pxsol.ed25519.Fr(random.randint(1, pxsol.ed25519.N - 1))
+    assert pxsol.ed25519.pt_torsion_free(pxsol.ed25519.G.ext())
+    assert pxsol.ed25519.pt_torsion_free(p.ext())
+    assert not pxsol.ed25519.pt_torsion_free(t.ext())
+    assert not pxsol.ed25519.pt_torsion_free((p + t).ext())
@@ -1,6 +1,7 @@
 import pxsol
 import pytest
 import random
+import time
 
 
 def test_fail_verify():
@@ -33,6 +34,12 @@ def test_pt_exists():
                 pxsol.eddsa.pt_decode(ptbyte)
 
 
+def test_pubkey_many():
+    prikey = [bytearray(random.randbytes(32)) for _ in range(8)]
+    assert pxsol.eddsa.pubkey_many(prikey) == [pxsol.eddsa.pubkey(e) for e in prikey]
+    assert pxsol.eddsa.pubkey_many([]) == []
+
+
 def test_sign_verify():
     # https://datatracker.ietf.org/doc/html/rfc8032#section-7.1
     # Test Slices for Ed25519
@@ -101,3 +108,68 @@ def test_sign_verify():
         0x3d, 0xca, 0x17, 0x9c, 0x13, 0x8a, 0xc1, 0x7a, 0xd9, 0xbe, 0xf1, 0x17, 0x73, 0x31, 0xa7, 0x04,
     ])
     assert pxsol.eddsa.verify(pubkey, msg, sig)
+
+
+def test_verify_batch():
+    data = []
+    for _ in range(8):
+        prikey = bytearray(random.randbytes(32))
+        msg = bytearray(random.randbytes(random.randint(0, 64)))
+        data.append((pxsol.eddsa.pubkey(prikey), msg, pxsol.eddsa.sign(prikey, msg)))
+    assert pxsol.eddsa.verify_batch(data)
+    assert pxsol.eddsa.verify_batch_invalid(data) == []
+    data[2] = (data[2][0], data[2][1] + bytearray([0x00]), data[2][2])
+    data[5] = (data[5][0], data[5][1], data[4][2])
+    assert not pxsol.eddsa.verify_batch(data)
+    assert pxsol.eddsa.verify_batch_invalid(data) == [2, 5]
+
+
+def test_verify_batch_torsion():
+    # A point of order 2 added to R or A. The cofactored batch equation cannot see it, verify and strict mode can.
+    t = pxsol.ed25519.Pt(pxsol.ed25519.Fq(0), -pxsol.ed25519.Fq(1))
+    prikey = bytearray(random.randbytes(32))
+    a, _ = pxsol.eddsa.expand(prikey)
+    pubkey = pxsol.eddsa.pubkey(prikey)
+    data = []
+    for _ in range(4):
+        msg = bytearray(random.randbytes(random.randint(0, 64)))
+        data.append((pubkey, msg, pxsol.eddsa.sign(prikey, msg)))
+    # R = r * G + t is rejected by verify.
+    r = pxsol.ed25519.Fr(random.randint(1, pxsol.ed25519.N - 1))
+    rt = pxsol.eddsa.pt_encode(pxsol.ed25519.G * r + t)
+    msg = bytearray(random.randbytes(32))
+    h = pxsol.ed25519.Fr(int.from_bytes(pxsol.eddsa.hash(rt + pubkey + msg), 'little'))
+    sig = rt + bytearray((r + a * h).n.to_bytes(32, 'little'))
+    assert not pxsol.eddsa.verify(pubkey, msg, sig)
+    assert pxsol.eddsa.verify_batch(data + [(pubkey, msg, sig)])
+    assert pxsol.eddsa.verify_batch_invalid(data + [(pubkey, msg, sig)]) == []
+    assert not pxsol.eddsa.verify_batch(data + [(pubkey, msg, sig)], strict=True)
+    assert pxsol.eddsa.verify_batch_invalid(data + [(pubkey, msg, sig)], strict=True) == [4]
+    # A + t with R = r * G + t and an odd h is accepted by verify.
+    at = pxsol.eddsa.pt_encode(pxsol.ed25519.G * a + t)
+    for _ in range(64):
+        msg = bytearray(random.randbytes(32))
+        h = pxsol.ed25519.Fr(int.from_bytes(pxsol.eddsa.hash(rt + at + msg), 'little'))
+        if h.n & 1:
+            break
+    sig = rt + bytearray((r + a * h).n.to_bytes(32, 'little'))
+    assert pxsol.eddsa.verify(at, msg, sig)
+    assert pxsol.eddsa.verify_batch(data + [(at, msg, sig)])
+    assert pxsol.eddsa.verify_batch_invalid(data + [(at, msg, sig)]) == []
+    assert pxsol.eddsa.verify_batch(data + [(at, msg, sig)], strict=True)
+    assert pxsol.eddsa.verify_batch_invalid(data + [(at, msg, sig)], strict=True) == []
+
+
+def test_verify_batch_speedup():
+    data = []
+    for _ in range(128):
+        prikey = bytearray(random.randbytes(32))
+        msg = bytearray(random.randbytes(32))
+        data.append((pxsol.eddsa.pubkey(prikey), msg, pxsol.eddsa.sign(prikey, msg)))
+    t = time.perf_counter()
+    assert all(pxsol.eddsa.verify(*e) for e in data)
+    a = time.perf_counter() - t
+    t = time.perf_counter()
+    assert pxsol.eddsa.verify_batch(data)
+    b = time.perf_counter() - t
+    assert b * 1.5 < a
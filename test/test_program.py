@@ -25,3 +25,18 @@ def test_address_lookup_table():
     tx.sign([user.prikey])
     txid = pxsol.rpc.send_transaction(base64.b64encode(tx.serialize()).decode(), {})
     pxsol.rpc.wait([txid])
+
+
+def test_token_extension_metadata_emit():
+    data = pxsol.program.TokenExtensionMetadata.emit(1, None)
+    assert data == bytearray.fromhex('faa6b4fa0d0cb846' + '010100000000000000' + '00')
+    data = pxsol.program.TokenExtensionMetadata.emit(None, 10)
+    assert data == bytearray.fromhex('faa6b4fa0d0cb846' + '00' + '010a00000000000000')
+
+
+def test_token_extension_metadata_update_authority():
+    auth = pxsol.core.PriKey.int_decode(1).pubkey()
+    data = pxsol.program.TokenExtensionMetadata.update_authority(auth)
+    assert data == bytearray.fromhex('d7e4a6e45464567b') + auth.p
+    data = pxsol.program.TokenExtensionMetadata.update_authority(None)
+    assert data == bytearray.fromhex('d7e4a6e45464567b') + bytearray(32)
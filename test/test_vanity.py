@@ -0,0 +1,14 @@
+import pxsol
+
+
+def test_match():
+    assert pxsol.vanity.match('6ASf5EcmmEHTgDJ4X4ZT5vT6iHVJBXPg5AN5YoTCpGWt', '6AS', 'GWt', False)
+    assert not pxsol.vanity.match('6ASf5EcmmEHTgDJ4X4ZT5vT6iHVJBXPg5AN5YoTCpGWt', '6as', '', False)
+    assert pxsol.vanity.match('6ASf5EcmmEHTgDJ4X4ZT5vT6iHVJBXPg5AN5YoTCpGWt', '6as', 'gwt', True)
+
+
+def test_search_chunk():
+    seed = pxsol.vanity.search_chunk('', '', False, 4)
+    assert seed is not None
+    prikey = pxsol.core.PriKey(bytearray(seed))
+    assert pxsol.vanity.match(prikey.pubkey().base58(), '', '', False)